@@ -6,6 +6,7 @@ of the application. The configuration settings are stored in a 'config.yaml' fil
 import os
 import sys
 import logging
+from dataclasses import dataclass
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap
 
@@ -13,6 +14,36 @@ logger = logging.getLogger("__main__")
 logger.info("[Config] loading module ")
 
 
+@dataclass(frozen=True, slots=True)
+class BatteryConfig:
+    """
+    Read-only snapshot of the battery settings used for every optimization request.
+    """
+
+    capacity_wh: int
+    charge_efficiency: float
+    discharge_efficiency: float
+    max_charge_power_w: int
+    min_soc_percentage: int
+    max_soc_percentage: int
+    price_euro_per_wh_accu: float
+
+    @classmethod
+    def from_config(cls, battery_config):
+        """
+        Creates the snapshot from the "battery" section of the configuration.
+        """
+        return cls(
+            capacity_wh=battery_config["capacity_wh"],
+            charge_efficiency=battery_config["charge_efficiency"],
+            discharge_efficiency=battery_config["discharge_efficiency"],
+            max_charge_power_w=battery_config["max_charge_power_w"],
+            min_soc_percentage=battery_config["min_soc_percentage"],
+            max_soc_percentage=battery_config["max_soc_percentage"],
+            price_euro_per_wh_accu=battery_config["price_euro_per_wh_accu"],
+        )
+
+
 class ConfigManager:
     """
     Manages the configuration settings for the application.
@@ -32,6 +63,11 @@ class ConfigManager:
         self.default_config = self.create_default_config()
         self.config = self.default_config.copy()
         self.load_config()
+        # the config is not changed at runtime - snapshot the hot path settings,
+        # missing battery keys fall back to their default values
+        self.battery = BatteryConfig.from_config(
+            {**self.default_config["battery"], **self.config["battery"]}
+        )
 
     def create_default_config(self):
         """
@@ -149,6 +185,8 @@ class ConfigManager:
                 "time_zone": "Europe/Berlin",  # Add default time zone
                 "eos_connect_web_port": 8081,  # Default port for EOS connect server
                 "log_level": "info",  # Default log level
+                # store optimize request/response as json files for debugging
+                "persist_optimize_json": False,
             }
         )
         # load configuration
@@ -412,6 +450,12 @@ class ConfigManager:
             "Log level for the application : debug, info, warning, error - default: info",
             "log_level",
         )
+        # optimize json persistence configuration
+        config.yaml_add_eol_comment(
+            "Write optimize_request.json and optimize_response.json to the json folder"
+            + " for debugging - default: false",
+            "persist_optimize_json",
+        )
         return config
 
     def load_config(self):
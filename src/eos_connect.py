@@ -3,19 +3,33 @@ This module fetches energy data from OpenHAB, processes it, and creates a load p
 """
 
 import os
+import re
+import signal
 import sys
+import atexit
 from datetime import datetime
+from functools import lru_cache
 import time
 import logging
+import logging.handlers
+import math
 import json
+import queue
 import threading
-import pytz
+from zoneinfo import ZoneInfo
+import gevent
 import requests
-from flask import Flask, Response, render_template_string, request, send_from_directory
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, request, send_from_directory
+from werkzeug.security import safe_join
 from version import __version__
 from config import ConfigManager
-from log_handler import MemoryLogHandler
-from interfaces.base_control import BaseControl
+from log_handler import MemoryLogHandler, TimezoneFormatter
+from interfaces.base_control import (
+    BaseControl,
+    check_mode_override,
+    parse_override_duration,
+)
 from interfaces.load_interface import LoadInterface
 from interfaces.battery_interface import BatteryInterface
 from interfaces.inverter_fronius import FroniusWR
@@ -26,6 +40,11 @@ from interfaces.price_interface import PriceInterface
 from interfaces.mqtt_interface import MqttInterface
 from interfaces.pv_interface import PvInterface
 from interfaces.port_interface import PortInterface
+from interfaces.json_utils import (
+    iter_json_object_with_list,
+    json_dumps_compact,
+    json_dumps_pretty,
+)
 
 # Check Python version early
 if sys.version_info < (3, 11):
@@ -39,23 +58,6 @@ if sys.version_info < (3, 11):
 EOS_TGT_DURATION = 48
 
 
-###################################################################################################
-# Custom formatter to use the configured timezone
-class TimezoneFormatter(logging.Formatter):
-    """
-    A custom logging formatter that formats log timestamps according to a specified timezone.
-    """
-
-    def __init__(self, fmt=None, datefmt=None, tz=None):
-        super().__init__(fmt, datefmt)
-        self.tz = tz
-
-    def formatTime(self, record, datefmt=None):
-        # Convert the record's timestamp to the configured timezone
-        record_time = datetime.fromtimestamp(record.created, self.tz)
-        return record_time.strftime(datefmt or self.default_time_format)
-
-
 ##################################################################################################
 LOGLEVEL = logging.DEBUG  # start before reading the config file
 logger = logging.getLogger(__name__)
@@ -80,7 +82,7 @@ else:
 
 ###################################################################################################
 config_manager = ConfigManager(current_dir)
-time_zone = pytz.timezone(config_manager.config["time_zone"])
+time_zone = ZoneInfo(config_manager.config["time_zone"])
 
 LOGLEVEL = config_manager.config["log_level"].upper()
 logger.setLevel(LOGLEVEL)
@@ -96,7 +98,19 @@ memory_handler = MemoryLogHandler(
     max_alerts=2000,  # Dedicated alert buffer (WARNING/ERROR/CRITICAL only)
 )
 memory_handler.setFormatter(timezone_formatter)  # Use timezone formatter for web logs
-logger.addHandler(memory_handler)
+
+# the logging calls only enqueue the records - formatting and writing to stdout
+# and the memory buffer is done by the listener thread
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue, streamhandler, memory_handler, respect_handler_level=True
+)
+logger.removeHandler(streamhandler)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener.start()
+# registered after the logging module's own atexit hook, so it runs before
+# logging.shutdown() and the queued records are written first
+atexit.register(log_listener.stop)
 logger.debug("[Main] Memory log handler initialized successfully")
 
 logger.info(
@@ -104,14 +118,25 @@ logger.info(
     config_manager.config["time_zone"],
     LOGLEVEL,
 )
+# shared http session - keeps connections to EOS and all data sources alive
+http_session = requests.Session()
+http_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+http_session.mount("http://", http_adapter)
+http_session.mount("https://", http_adapter)
+atexit.register(http_session.close)
+
 # initialize eos interface
 eos_interface = EosInterface(
     eos_server=config_manager.config["eos"]["server"],
     eos_port=config_manager.config["eos"]["port"],
     timezone=time_zone,
+    session=http_session,
 )
 # initialize base control
 base_control = BaseControl(config_manager.config, time_zone)
+# interfaces with background threads or device state, stopped on shutdown -
+# an interface is only registered once it was created successfully
+shutdown_registry = []
 # initialize the inverter interface
 inverter_interface = None
 
@@ -125,26 +150,23 @@ if inverter_type == "fronius_gen24_v2":
     )
     inverter_type = "fronius_gen24"  # Auto-migrate to new name
 
-if inverter_type == "fronius_gen24":
+# supported inverter interfaces: type -> (interface class, description)
+INVERTER_INTERFACES = {
     # Enhanced V2 interface (default for existing users)
-    logger.info(
-        "[Inverter] Using enhanced Fronius GEN24 interface with firmware-based authentication"
-    )
-    inverter_config = {
-        "address": config_manager.config["inverter"]["address"],
-        "max_grid_charge_rate": config_manager.config["inverter"][
-            "max_grid_charge_rate"
-        ],
-        "max_pv_charge_rate": config_manager.config["inverter"]["max_pv_charge_rate"],
-        "user": config_manager.config["inverter"]["user"],
-        "password": config_manager.config["inverter"]["password"],
-    }
-    inverter_interface = FroniusWRV2(inverter_config)
-elif inverter_type == "fronius_gen24_legacy":
+    "fronius_gen24": (
+        FroniusWRV2,
+        "enhanced Fronius GEN24 interface with firmware-based authentication",
+    ),
     # Legacy V1 interface (for corner cases)
-    logger.info(
-        "[Inverter] Using legacy Fronius GEN24 interface (V1) for compatibility"
-    )
+    "fronius_gen24_legacy": (
+        FroniusWR,
+        "legacy Fronius GEN24 interface (V1) for compatibility",
+    ),
+}
+
+if inverter_type in INVERTER_INTERFACES:
+    inverter_class, inverter_description = INVERTER_INTERFACES[inverter_type]
+    logger.info("[Inverter] Using %s", inverter_description)
     inverter_config = {
         "address": config_manager.config["inverter"]["address"],
         "max_grid_charge_rate": config_manager.config["inverter"][
@@ -154,7 +176,9 @@ elif inverter_type == "fronius_gen24_legacy":
         "user": config_manager.config["inverter"]["user"],
         "password": config_manager.config["inverter"]["password"],
     }
-    inverter_interface = FroniusWR(inverter_config)
+    inverter_interface = inverter_class(inverter_config)
+    # restores the old inverter config on shutdown
+    shutdown_registry.append(("inverter", inverter_interface))
 elif inverter_type == "evcc":
     logger.info(
         "[Inverter] Inverter type %s - using the universal evcc external battery control.",
@@ -167,6 +191,10 @@ else:
         config_manager.config["inverter"]["type"],
     )
 
+# the inverter type does not change at runtime - resolved once for the control loops
+INVERTER_FRONIUS_EN = inverter_type in INVERTER_INTERFACES
+INVERTER_EVCC_EN = inverter_type == "evcc"
+
 
 # callback function for evcc interface
 def charging_state_callback(new_state):
@@ -185,10 +213,11 @@ def battery_state_callback():
     """
     Callback function that gets triggered when the battery state changes.
     """
-    logger.debug(
-        "[MAIN] Battery Event - State of charge changed to: %s",
-        battery_interface.get_current_soc(),
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[MAIN] Battery Event - State of charge changed to: %s",
+            battery_interface.get_current_soc(),
+        )
     # update the base control with the new battery state of charge
     change_control_state()
 
@@ -209,25 +238,34 @@ def mqtt_control_callback(command):
     """
     # Default to "02:00" if empty or None
     duration_string = command.get("duration", "02:00") or "02:00"
-    duration_hh = duration_string.split(":")[0]
-    duration_mm = duration_string.split(":")[1]
-    duration = int(duration_hh) * 60 + int(duration_mm)
     # Default to 0 if empty or None
     charge_power = command.get("charge_power", 0) or 0
-    charge_power = int(charge_power) / 1000  # convert to kW
+    try:
+        mode = int(command["mode"])
+        duration = parse_override_duration(duration_string)
+        charge_power = int(charge_power) / 1000  # convert to kW
+    except ValueError as e:
+        logger.warning("[MAIN] MQTT Event - %s - command ignored", e)
+        return
+    # same bound as the web ui - max charge power of the battery in kW with one
+    # decimal
+    max_grid_charge_power = (
+        math.ceil(config_manager.battery.max_charge_power_w / 100) / 10
+    )
+    error = check_mode_override(mode, duration, charge_power, max_grid_charge_power)
+    if error is not None:
+        logger.warning("[MAIN] MQTT Event - %s - command ignored", error)
+        return
     # update the base control with the new charging state
-    base_control.set_mode_override(int(command["mode"]), duration, charge_power)
+    base_control.set_mode_override(mode, duration, charge_power)
+    override_active, override_end_time = base_control.get_override_active_and_endtime()
     mqtt_interface.update_publish_topics(
         {
             "control/override_charge_power": {"value": charge_power * 1000},
-            "control/override_active": {
-                "value": base_control.get_override_active_and_endtime()[0]
-            },
+            "control/override_active": {"value": override_active},
             "control/override_end_time": {
-                "value": (
-                    datetime.fromtimestamp(
-                        base_control.get_override_active_and_endtime()[1], time_zone
-                    )
+                "value": datetime.fromtimestamp(
+                    override_end_time, time_zone
                 ).isoformat()
             },
         }
@@ -239,33 +277,44 @@ def mqtt_control_callback(command):
 mqtt_interface = MqttInterface(
     config_mqtt=config_manager.config["mqtt"], on_mqtt_command=None
 )
+shutdown_registry.append(("mqtt", mqtt_interface))
 
 evcc_interface = EvccInterface(
     url=config_manager.config.get("evcc", {}).get("url", ""),
     ext_bat_mode=config_manager.config["inverter"]["type"] == "evcc",
     update_interval=10,
     on_charging_state_change=None,
+    session=http_session,
 )
+shutdown_registry.append(("evcc", evcc_interface))
 
 # intialize the load interface
 load_interface = LoadInterface(
     config_manager.config.get("load", {}),
     time_zone,
+    session=http_session,
 )
 
 battery_interface = BatteryInterface(
     config_manager.config["battery"],
     on_bat_max_changed=None,
+    session=http_session,
 )
+shutdown_registry.append(("battery", battery_interface))
 
-price_interface = PriceInterface(config_manager.config["price"], time_zone)
+price_interface = PriceInterface(
+    config_manager.config["price"], time_zone, session=http_session
+)
+shutdown_registry.append(("price", price_interface))
 
 pv_interface = PvInterface(
     config_manager.config["pv_forecast_source"],
     config_manager.config["pv_forecast"],
     config_manager.config.get("evcc", {}),
     config_manager.config.get("time_zone", "UTC"),
+    session=http_session,
 )
+shutdown_registry.append(("pv", pv_interface))
 
 # wait for the interfaces to initialize - depend on entries for pv_forecast
 init_time = 3 + 1 * len(config_manager.config["pv_forecast"])
@@ -276,58 +325,24 @@ time.sleep(init_time)
 # sys.exit(0)  # exit if the interfaces are not initialized correctly
 
 
-# summarize all date
-def create_optimize_request():
+def create_static_optimize_data():
     """
-    Creates an optimization request payload for energy management systems.
-
-    Args:
-        api_version (str): The API version to use for the request. Defaults to "new".
+    Creates the parts of the optimization request that do not change at runtime.
+    The EOS version is only retrieved at startup and the config is not reloaded,
+    so the inverter, e-car and dishwasher entries are built once and reused for
+    every optimization request.
 
     Returns:
-        dict: A dictionary containing the payload for the optimization request.
+        dict: The "inverter", "eauto" and "dishwasher" payload entries.
     """
-
-    def get_ems_data():
-        return {
-            "pv_prognose_wh": pv_interface.get_current_pv_forecast(),
-            "strompreis_euro_pro_wh": price_interface.get_current_prices(),
-            "einspeiseverguetung_euro_pro_wh": price_interface.get_current_feedin_prices(),
-            "preis_euro_pro_wh_akku": config_manager.config["battery"][
-                "price_euro_per_wh_accu"
-            ],
-            "gesamtlast": load_interface.get_load_profile(EOS_TGT_DURATION),
-        }
-
-    def get_pv_akku_data():
-        akku_object = {
-            "capacity_wh": config_manager.config["battery"]["capacity_wh"],
-            "charging_efficiency": config_manager.config["battery"][
-                "charge_efficiency"
-            ],
-            "discharging_efficiency": config_manager.config["battery"][
-                "discharge_efficiency"
-            ],
-            "max_charge_power_w": config_manager.config["battery"][
-                "max_charge_power_w"
-            ],
-            "initial_soc_percentage": round(battery_interface.get_current_soc()),
-            "min_soc_percentage": config_manager.config["battery"][
-                "min_soc_percentage"
-            ],
-            "max_soc_percentage": config_manager.config["battery"][
-                "max_soc_percentage"
-            ],
-        }
-        if eos_interface.get_eos_version() == ">=2025-04-09":
-            akku_object = {"device_id": "battery1", **akku_object}
-        return akku_object
+    with_device_ids = eos_interface.get_eos_version() == ">=2025-04-09"
+    load_config = config_manager.config["load"]
 
     def get_wechselrichter_data():
         wechselrichter_object = {
             "max_power_wh": config_manager.config["inverter"]["max_pv_charge_rate"],
         }
-        if eos_interface.get_eos_version() == ">=2025-04-09":
+        if with_device_ids:
             wechselrichter_object = {
                 "device_id": "inverter1",
                 **wechselrichter_object,
@@ -345,39 +360,87 @@ def create_optimize_request():
             "min_soc_percentage": 5,
             "max_soc_percentage": 100,
         }
-        if eos_interface.get_eos_version() == ">=2025-04-09":
+        if with_device_ids:
             eauto_object = {"device_id": "ev1", **eauto_object}
         return eauto_object
 
     def get_dishwasher_data():
-        consumption_wh = config_manager.config["load"].get(
-            "additional_load_1_consumption", 1
-        )
+        consumption_wh = load_config.get("additional_load_1_consumption", 1)
         if not consumption_wh or consumption_wh == 0:
             consumption_wh = 1
-        duration_h = config_manager.config["load"].get("additional_load_1_runtime", 1)
+        duration_h = load_config.get("additional_load_1_runtime", 1)
         if not duration_h or duration_h == 0:
             duration_h = 1
         dishwasher_object = {
             "consumption_wh": consumption_wh,
             "duration_h": duration_h,
         }
-        if eos_interface.get_eos_version() == ">=2025-04-09":
+        if with_device_ids:
             dishwasher_object = {"device_id": "additional_load_1", **dishwasher_object}
         return dishwasher_object
 
-    payload = {
-        "ems": get_ems_data(),
-        "pv_akku": get_pv_akku_data(),
+    return {
         "inverter": get_wechselrichter_data(),
         "eauto": get_eauto_data(),
         "dishwasher": get_dishwasher_data(),
+    }
+
+
+STATIC_OPTIMIZE_DATA = create_static_optimize_data()
+
+
+# summarize all date
+def create_optimize_request():
+    """
+    Creates an optimization request payload for energy management systems.
+
+    Args:
+        api_version (str): The API version to use for the request. Defaults to "new".
+
+    Returns:
+        dict: A dictionary containing the payload for the optimization request.
+    """
+    # evaluate the EOS version once - the battery entry depends on it
+    with_device_ids = eos_interface.get_eos_version() == ">=2025-04-09"
+    battery_config = config_manager.battery
+
+    def get_ems_data():
+        return {
+            "pv_prognose_wh": pv_interface.get_current_pv_forecast(),
+            "strompreis_euro_pro_wh": price_interface.get_current_prices(),
+            "einspeiseverguetung_euro_pro_wh": price_interface.get_current_feedin_prices(),
+            "preis_euro_pro_wh_akku": battery_config.price_euro_per_wh_accu,
+            "gesamtlast": load_interface.get_load_profile(EOS_TGT_DURATION),
+        }
+
+    def get_pv_akku_data():
+        akku_object = {
+            "capacity_wh": battery_config.capacity_wh,
+            "charging_efficiency": battery_config.charge_efficiency,
+            "discharging_efficiency": battery_config.discharge_efficiency,
+            "max_charge_power_w": battery_config.max_charge_power_w,
+            "initial_soc_percentage": round(battery_interface.get_current_soc()),
+            "min_soc_percentage": battery_config.min_soc_percentage,
+            "max_soc_percentage": battery_config.max_soc_percentage,
+        }
+        if with_device_ids:
+            akku_object = {"device_id": "battery1", **akku_object}
+        return akku_object
+
+    payload = {
+        "ems": get_ems_data(),
+        "pv_akku": get_pv_akku_data(),
+        "inverter": STATIC_OPTIMIZE_DATA["inverter"],
+        "eauto": STATIC_OPTIMIZE_DATA["eauto"],
+        "dishwasher": STATIC_OPTIMIZE_DATA["dishwasher"],
         "temperature_forecast": pv_interface.get_current_temp_forecast(),
         "start_solution": eos_interface.get_last_start_solution(),
     }
-    logger.debug(
-        "[Main] optimize request payload - startsolution: %s", payload["start_solution"]
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[Main] optimize request payload - startsolution: %s",
+            payload["start_solution"],
+        )
     return payload
 
 
@@ -392,7 +455,7 @@ def setting_control_data(ac_charge_demand_rel, dc_charge_demand_rel, discharge_a
     """
     # Safety check: Prevent AC charging if battery SoC exceeds maximum
     current_soc = battery_interface.get_current_soc()
-    max_soc = config_manager.config["battery"]["max_soc_percentage"]
+    max_soc = config_manager.battery.max_soc_percentage
 
     if current_soc >= max_soc and ac_charge_demand_rel > 0:
         logger.warning(
@@ -421,22 +484,41 @@ def setting_control_data(ac_charge_demand_rel, dc_charge_demand_rel, discharge_a
         }
     )
     # set the current battery state of charge
-    base_control.set_current_battery_soc(battery_interface.get_current_soc())
+    base_control.set_current_battery_soc(current_soc)
     # getting the current charging state from evcc
     base_control.set_current_evcc_charging_state(evcc_interface.get_charging_state())
     base_control.set_current_evcc_charging_mode(evcc_interface.get_charging_mode())
 
 
+# mqtt topic -> key in the inverter monitoring data, published by the data loop
+INVERTER_SPECIAL_DATA_TOPICS = (
+    ("inverter/special/temperature_inverter", "DEVICE_TEMPERATURE_AMBIENTEMEAN_F32"),
+    ("inverter/special/temperature_ac_module", "MODULE_TEMPERATURE_MEAN_01_F32"),
+    ("inverter/special/temperature_dc_module", "MODULE_TEMPERATURE_MEAN_03_F32"),
+    ("inverter/special/temperature_battery_module", "MODULE_TEMPERATURE_MEAN_04_F32"),
+    ("inverter/special/fan_control_01", "FANCONTROL_PERCENT_01_F32"),
+    ("inverter/special/fan_control_02", "FANCONTROL_PERCENT_02_F32"),
+)
+# reused by every data loop run - update_publish_topics only reads the values
+inverter_special_topics = {
+    topic: {"value": None} for topic, _ in INVERTER_SPECIAL_DATA_TOPICS
+}
+
+
 class OptimizationScheduler:
     """
     A scheduler class that manages the periodic execution of an optimization process
     in a background thread. The class is responsible for starting, stopping, and
     managing the lifecycle of the optimization service.
+    The optimization, control and data loops run in named daemon threads, because
+    all interfaces they call are blocking; the threads sleep on one shared stop
+    condition between runs, which shutdown() notifies once for all of them.
     Attributes:
         update_interval (int): The interval in seconds between optimization runs.
         _update_thread_optimization_loop (threading.Thread): The background thread
             running the optimization loop.
-        _stop_event (threading.Event): An event used to signal the thread to stop.
+        _stop_condition (threading.Condition): Condition the loops wait on between
+            runs; shutdown() sets _stopping and notifies all of them.
     Methods:
         __start_update_service_optimization_loop():
         shutdown():
@@ -444,26 +526,24 @@ class OptimizationScheduler:
         __run_optimization_loop():
     """
 
-    def __init__(self, update_interval):
+    def __init__(self, update_interval, persist_json=False):
         self.update_interval = update_interval
+        self.persist_json = persist_json
         self.last_request_response = {
-            "request": json.dumps(
-                {
-                    "status": "Awaiting first optimization run",
-                },
-                indent=4,
-            ),
-            "response": json.dumps(
-                {
-                    "status": "starting up",
-                    "message": (
-                        "The first request has been sent to EOS and is now waiting for "
-                        "the completion of the first optimization run."
-                    ),
-                },
-                indent=4,
-            ),
+            "request": {
+                "status": "Awaiting first optimization run",
+            },
+            "response": {
+                "status": "starting up",
+                "message": (
+                    "The first request has been sent to EOS and is now waiting for "
+                    "the completion of the first optimization run."
+                ),
+            },
         }
+        # serialized versions of last_request_response - created on first access
+        # and kept together with the dict they were created from
+        self._last_request_response_json = {}
         self.current_state = {
             "request_state": None,
             "last_request_timestamp": None,
@@ -471,46 +551,78 @@ class OptimizationScheduler:
             "last_response_timestamp": datetime.now(time_zone).isoformat(),
             "next_run": None,
         }
+        # json dumps are written by a separate thread to keep disk latency away
+        # from the optimization loop - only the latest content per file is kept
+        self._json_file_queue = queue.SimpleQueue()
+        self._json_files_pending = {}
+        self._json_files_lock = threading.Lock()
+        self._json_file_writer_thread = None
+        if self.persist_json:
+            self._json_file_writer_thread = threading.Thread(
+                target=self.__json_file_writer_loop,
+                name="json_file_writer",
+                daemon=True,
+            )
+            self._json_file_writer_thread.start()
+        self._stop_condition = threading.Condition()
+        self._stopping = False
         self._update_thread_optimization_loop = None
-        self._stop_event = threading.Event()
         self._last_avg_runtime = 120  # Initialize with a default value
         self.__start_update_service_optimization_loop()
         self._update_thread_control_loop = None
-        self._stop_event_control_loop = threading.Event()
         self.__start_update_service_control_loop()
         self._update_thread_data_loop = None
-        self._stop_event_data_loop = threading.Event()
         self.__start_update_service_data_loop()
 
+    def __wait_for_stop(self, timeout):
+        """
+        Waits up to timeout seconds for shutdown(). Returns True as soon as the
+        scheduler is stopping.
+        """
+        with self._stop_condition:
+            return self._stop_condition.wait_for(lambda: self._stopping, timeout)
+
     def get_last_request_response(self):
         """
         Returns the last request response.
         """
         return self.last_request_response
 
+    def get_last_request_response_json(self, key):
+        """
+        Returns the last "request" or "response" as utf-8 encoded json.
+        The bytes are only created when they are requested for the first time after
+        an optimization run, repeated calls return the cached bytes, which the web
+        server sends without encoding them again.
+        """
+        data = self.last_request_response[key]
+        cached_data, cached_json = self._last_request_response_json.get(
+            key, (None, None)
+        )
+        if cached_data is not data:
+            cached_json = json_dumps_pretty(data).encode("utf-8")
+            self._last_request_response_json[key] = (data, cached_json)
+        return cached_json
+
     def get_current_state(self):
         """
         Returns the current state of the optimization scheduler.
         """
         return self.current_state
 
-    def __set_state_request(self):
+    def __set_state_request(self, timestamp):
         """
         Sets the current state of the optimization scheduler.
         """
         self.current_state["request_state"] = "request send"
-        self.current_state["last_request_timestamp"] = datetime.now(
-            time_zone
-        ).isoformat()
+        self.current_state["last_request_timestamp"] = timestamp
 
-    def __set_state_response(self):
+    def __set_state_response(self, timestamp):
         """
         Sets the current state of the optimization scheduler.
         """
         self.current_state["request_state"] = "response received"
-        self.current_state["last_response_timestamp"] = datetime.now(
-            time_zone
-        ).isoformat()
+        self.current_state["last_response_timestamp"] = timestamp
 
     def __set_state_next_run(self, next_run_time):
         """
@@ -526,9 +638,10 @@ class OptimizationScheduler:
             self._update_thread_optimization_loop is None
             or not self._update_thread_optimization_loop.is_alive()
         ):
-            self._stop_event.clear()
             self._update_thread_optimization_loop = threading.Thread(
-                target=self.__update_state_optimization_loop, daemon=True
+                target=self.__update_state_optimization_loop,
+                name="optimization_loop",
+                daemon=True,
             )
             self._update_thread_optimization_loop.start()
             logger.info("[OPTIMIZATION] Update service Optimization Run started.")
@@ -537,7 +650,7 @@ class OptimizationScheduler:
         """
         The loop that runs in the background thread to update the state.
         """
-        while not self._stop_event.is_set():
+        while not self._stopping:
             try:
                 self.__run_optimization_loop()
 
@@ -573,13 +686,15 @@ class OptimizationScheduler:
             except (requests.exceptions.RequestException, ValueError, KeyError) as e:
                 logger.error("[OPTIMIZATION] Error while updating state: %s", e)
                 actual_sleep_interval = self.update_interval  # Fallback on error
+            except Exception:  # pylint: disable=broad-exception-caught
+                # an unexpected error must not end the thread - without it no
+                # further optimization would be run until a restart
+                logger.exception("[OPTIMIZATION] Unexpected error in optimization run")
+                actual_sleep_interval = self.update_interval  # Fallback on error
 
-            # Use the calculated sleep interval instead of fixed interval
-            while actual_sleep_interval > 0:
-                if self._stop_event.is_set():
-                    return  # Exit immediately if stop event is set
-                time.sleep(min(1, actual_sleep_interval))  # Sleep in 1-second chunks
-                actual_sleep_interval -= 1
+            # Use the calculated sleep interval - wakes up immediately on shutdown
+            if self.__wait_for_stop(actual_sleep_interval):
+                return
 
         # self.__start_update_service_optimization_loop()
 
@@ -590,9 +705,9 @@ class OptimizationScheduler:
         the next optimization run.
         The method performs the following steps:
         1. Logs the start of a new optimization run.
-        2. Creates an optimization request in JSON format and saves it to a file.
+        2. Creates an optimization request in JSON format and optionally saves it to a file.
         3. Sends the optimization request to the EOS interface and retrieves the response.
-        4. Adds a timestamp to the response and saves it to a file.
+        4. Adds a timestamp to the response and optionally saves it to a file.
         5. Extracts control data from the response and, if no error is detected,
            applies the control settings and updates the control state.
         6. Calculates the time for the next optimization run and logs the sleep duration.
@@ -613,12 +728,13 @@ class OptimizationScheduler:
         # )
         # create optimize request
         json_optimize_input = create_optimize_request()
-        self.__set_state_request()
+        self.__set_state_request(datetime.now(time_zone).isoformat())
 
-        with open(
-            base_path + "/json/optimize_request.json", "w", encoding="utf-8"
-        ) as file:
-            json.dump(json_optimize_input, file, indent=4)
+        if self.persist_json:
+            self.__queue_json_file(
+                "optimize_request.json",
+                json_dumps_pretty(json_optimize_input).encode("utf-8"),
+            )
 
         mqtt_interface.update_publish_topics(
             {"optimization/state": {"value": self.get_current_state()["request_state"]}}
@@ -629,35 +745,66 @@ class OptimizationScheduler:
         # Store the runtime for use in sleep calculation
         self._last_avg_runtime = avg_runtime
 
-        json_optimize_input["timestamp"] = datetime.now(time_zone).isoformat()
-        self.last_request_response["request"] = json.dumps(
-            json_optimize_input, indent=4
-        )
-        optimized_response["timestamp"] = datetime.now(time_zone).isoformat()
-        self.last_request_response["response"] = json.dumps(
-            optimized_response, indent=4
-        )
-        self.__set_state_response()
-
-        with open(
-            base_path + "/json/optimize_response.json", "w", encoding="utf-8"
-        ) as file:
-            json.dump(optimized_response, file, indent=4)
+        # one timestamp for everything that belongs to the received response
+        response_timestamp = datetime.now(time_zone).isoformat()
+        json_optimize_input["timestamp"] = response_timestamp
+        self.last_request_response["request"] = json_optimize_input
+        optimized_response["timestamp"] = response_timestamp
+        self.last_request_response["response"] = optimized_response
+        self.__set_state_response(response_timestamp)
+
+        if self.persist_json:
+            self.__queue_json_file(
+                "optimize_response.json",
+                self.get_last_request_response_json("response"),
+            )
         # +++++++++
         ac_charge_demand, dc_charge_demand, discharge_allowed, error = (
             eos_interface.examine_response_to_control_data(optimized_response)
         )
         if error is not True:
+            # also refreshes the battery soc and the recent evcc states
             setting_control_data(ac_charge_demand, dc_charge_demand, discharge_allowed)
-            # get recent evcc states
-            base_control.set_current_evcc_charging_state(
-                evcc_interface.get_charging_state()
-            )
-            base_control.set_current_evcc_charging_mode(
-                evcc_interface.get_charging_mode()
-            )
             # change_control_state() # -> moved to __run_control_loop
 
+    def __queue_json_file(self, filename, json_bytes):
+        """
+        Hands serialized json bytes over to the writer thread. If the file is
+        still waiting to be written, only its content is replaced.
+        """
+        with self._json_files_lock:
+            already_queued = filename in self._json_files_pending
+            self._json_files_pending[filename] = json_bytes
+        if not already_queued:
+            self._json_file_queue.put(filename)
+
+    def __json_file_writer_loop(self):
+        """
+        The loop that runs in the background thread to write the queued json files.
+        """
+        while True:
+            filename = self._json_file_queue.get()
+            if filename is None:
+                return  # shutdown requested
+            with self._json_files_lock:
+                json_bytes = self._json_files_pending.pop(filename, None)
+            if json_bytes is not None:
+                self.__write_json_file(filename, json_bytes)
+
+    def __write_json_file(self, filename, json_bytes):
+        """
+        Writes already serialized json bytes to the json folder. The content is
+        written to a temporary file first and then moved in place, so readers never
+        see a partially written file.
+        """
+        file_path = os.path.join(base_path, "json", filename)
+        try:
+            with open(file_path + ".tmp", "wb") as file:
+                file.write(json_bytes)
+            os.replace(file_path + ".tmp", file_path)
+        except OSError as e:
+            logger.warning("[OPTIMIZATION] Could not write %s: %s", filename, e)
+
     def __start_update_service_control_loop(self):
         """
         Starts the background thread to periodically update the state.
@@ -666,9 +813,10 @@ class OptimizationScheduler:
             self._update_thread_control_loop is None
             or not self._update_thread_control_loop.is_alive()
         ):
-            self._stop_event_control_loop.clear()
             self._update_thread_control_loop = threading.Thread(
-                target=self.__update_state_loop_control_loop, daemon=True
+                target=self.__update_state_loop_control_loop,
+                name="control_loop",
+                daemon=True,
             )
             self._update_thread_control_loop.start()
             logger.info("[OPTIMIZATION] Update service Control started.")
@@ -677,49 +825,38 @@ class OptimizationScheduler:
         """
         The loop that runs in the background thread to update the state.
         """
-        while not self._stop_event_control_loop.is_set():
+        while not self._stopping:
             try:
-                self.__run_control_loop()
+                # publish the mqtt updates of one run together
+                with mqtt_interface.batch():
+                    self.__run_control_loop()
             except (requests.exceptions.RequestException, ValueError, KeyError) as e:
                 logger.error("[OPTIMIZATION] Error while running control loop: %s", e)
-                # Break the sleep interval into smaller chunks to allow immediate shutdown
-            sleep_interval = 1
-            while sleep_interval > 0:
-                if self._stop_event_control_loop.is_set():
-                    return  # Exit immediately if stop event is set
-                time.sleep(min(1, sleep_interval))  # Sleep in 1-second chunks
-                sleep_interval -= 1
-        self.__start_update_service_control_loop()
+            # wait for the next run - wakes up immediately on shutdown
+            if self.__wait_for_stop(1):
+                return
 
     def __run_control_loop(self):
         current_hour = datetime.now(time_zone).hour
-        last_control_selected_entry = 0
-        if current_hour == eos_interface.get_last_control_data()[1]["hour"]:
-            last_control_selected_entry = 1
-        elif -1 == eos_interface.get_last_control_data()[0]["hour"]:
+        # fetch the control data once and select the entry for the current hour
+        last_control_data = eos_interface.get_last_control_data()
+        if current_hour == last_control_data[1]["hour"]:
+            control_entry = last_control_data[1]
+        elif -1 == last_control_data[0]["hour"]:
             # logger.debug("[Main] check current tgt ctrl - still in startup - skip")
             return
-        elif (
-            current_hour != eos_interface.get_last_control_data()[0]["hour"]
-            and current_hour != eos_interface.get_last_control_data()[1]["hour"]
-        ):
+        elif current_hour != last_control_data[0]["hour"]:
             logger.warning(
                 "[Main] check current tgt ctrl - wrong hour data for fast control - skip"
             )
             return
+        else:
+            control_entry = last_control_data[0]
 
-        ac_charge_demand = eos_interface.get_last_control_data()[
-            last_control_selected_entry
-        ]["ac_charge_demand"]
-        dc_charge_demand = eos_interface.get_last_control_data()[
-            last_control_selected_entry
-        ]["dc_charge_demand"]
-        discharge_allowed = eos_interface.get_last_control_data()[
-            last_control_selected_entry
-        ]["discharge_allowed"]
-        error = eos_interface.get_last_control_data()[last_control_selected_entry][
-            "error"
-        ]
+        ac_charge_demand = control_entry["ac_charge_demand"]
+        dc_charge_demand = control_entry["dc_charge_demand"]
+        discharge_allowed = control_entry["discharge_allowed"]
+        error = control_entry["error"]
 
         if (
             ac_charge_demand is None
@@ -746,14 +883,8 @@ class OptimizationScheduler:
             #     dc_charge_demand,
             #     discharge_allowed,
             # )
+            # also refreshes the battery soc and the recent evcc states
             setting_control_data(ac_charge_demand, dc_charge_demand, discharge_allowed)
-            # get recent evcc states
-            base_control.set_current_evcc_charging_state(
-                evcc_interface.get_charging_state()
-            )
-            base_control.set_current_evcc_charging_mode(
-                evcc_interface.get_charging_mode()
-            )
             change_control_state()
         # logger.debug(
         #     "[Main] Optimization control loop - secondly check - current state: %s (Num: %s)",
@@ -769,9 +900,10 @@ class OptimizationScheduler:
             self._update_thread_data_loop is None
             or not self._update_thread_data_loop.is_alive()
         ):
-            self._stop_event_data_loop.clear()
             self._update_thread_data_loop = threading.Thread(
-                target=self.__update_state_loop_data_loop, daemon=True
+                target=self.__update_state_loop_data_loop,
+                name="data_loop",
+                daemon=True,
             )
             self._update_thread_data_loop.start()
             logger.info("[OPTIMIZATION] Update service Data started.")
@@ -780,59 +912,26 @@ class OptimizationScheduler:
         """
         The loop that runs in the background thread to update the state.
         """
-        while not self._stop_event_data_loop.is_set():
+        while not self._stopping:
             try:
-                self.__run_data_loop()
+                # publish the mqtt updates of one run together
+                with mqtt_interface.batch():
+                    self.__run_data_loop()
             except (requests.exceptions.RequestException, ValueError, KeyError) as e:
                 logger.error(
                     "[OPTIMIZATION] Error while running data control loop: %s", e
                 )
-                # Break the sleep interval into smaller chunks to allow immediate shutdown
-            sleep_interval = 15
-            while sleep_interval > 0:
-                if self._stop_event_data_loop.is_set():
-                    return  # Exit immediately if stop event is set
-                time.sleep(min(1, sleep_interval))  # Sleep in 1-second chunks
-                sleep_interval -= 1
-        self.__start_update_service_data_loop()
+            # wait for the next run - wakes up immediately on shutdown
+            if self.__wait_for_stop(15):
+                return
 
     def __run_data_loop(self):
-        if inverter_type in ["fronius_gen24", "fronius_gen24_legacy"]:
+        if INVERTER_FRONIUS_EN:
             inverter_interface.fetch_inverter_data()
-            mqtt_interface.update_publish_topics(
-                {
-                    "inverter/special/temperature_inverter": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "DEVICE_TEMPERATURE_AMBIENTEMEAN_F32"
-                        ]
-                    },
-                    "inverter/special/temperature_ac_module": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "MODULE_TEMPERATURE_MEAN_01_F32"
-                        ]
-                    },
-                    "inverter/special/temperature_dc_module": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "MODULE_TEMPERATURE_MEAN_03_F32"
-                        ]
-                    },
-                    "inverter/special/temperature_battery_module": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "MODULE_TEMPERATURE_MEAN_04_F32"
-                        ]
-                    },
-                    "inverter/special/fan_control_01": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "FANCONTROL_PERCENT_01_F32"
-                        ]
-                    },
-                    "inverter/special/fan_control_02": {
-                        "value": inverter_interface.get_inverter_current_data()[
-                            "FANCONTROL_PERCENT_02_F32"
-                        ]
-                    },
-                }
-            )
+            inverter_data = inverter_interface.get_inverter_current_data()
+            for topic, data_key in INVERTER_SPECIAL_DATA_TOPICS:
+                inverter_special_topics[topic]["value"] = inverter_data[data_key]
+            mqtt_interface.update_publish_topics(inverter_special_topics)
             # logger.debug(
             #     "[Main] Inverter data fetched - %s",
             #     inverter_interface.get_inverter_current_data(),
@@ -840,33 +939,84 @@ class OptimizationScheduler:
 
     def shutdown(self):
         """
-        Stops the background thread and shuts down the update service.
+        Stops the background threads and shuts down the update service.
         """
-        if (
-            self._update_thread_optimization_loop
-            and self._update_thread_optimization_loop.is_alive()
+        # wake all loops at once, so they wind down concurrently
+        with self._stop_condition:
+            self._stopping = True
+            self._stop_condition.notify_all()
+        for thread, name in (
+            (self._update_thread_optimization_loop, "Optimization Loop"),
+            (self._update_thread_control_loop, "Control Loop"),
+            (self._update_thread_data_loop, "Data Loop"),
         ):
-            self._stop_event.set()
-            self._update_thread_optimization_loop.join()
-            logger.info("[OPTIMIZATION] Update service Optimization Loop stopped.")
-        if (
-            self._update_thread_control_loop
-            and self._update_thread_control_loop.is_alive()
-        ):
-            self._stop_event_control_loop.set()
-            self._update_thread_control_loop.join()
-            logger.info("[OPTIMIZATION] Update service Control Loop stopped.")
-        if self._update_thread_data_loop and self._update_thread_data_loop.is_alive():
-            self._stop_event_data_loop.set()
-            self._update_thread_data_loop.join()
-            logger.info("[OPTIMIZATION] Update service Data Loop stopped.")
+            if thread and thread.is_alive():
+                thread.join(timeout=20)
+                logger.info("[OPTIMIZATION] Update service %s stopped.", name)
+        if self._json_file_writer_thread and self._json_file_writer_thread.is_alive():
+            # the writer drains the queued files before it reaches the stop marker
+            self._json_file_queue.put(None)
+            self._json_file_writer_thread.join(timeout=5)
+            logger.info("[OPTIMIZATION] Json file writer stopped.")
 
 
 optimization_scheduler = OptimizationScheduler(
-    config_manager.config["refresh_time"] * 60  # convert to seconds
+    config_manager.config["refresh_time"] * 60,  # convert to seconds
+    config_manager.config.get("persist_optimize_json", False),
 )
 
 
+def set_fronius_mode_force_charge(tgt_ac_charge_power, _tgt_dc_charge_power):
+    """
+    Charges the battery from the grid with the target AC charge power.
+    """
+    inverter_interface.set_mode_force_charge(tgt_ac_charge_power)
+
+
+def set_fronius_mode_avoid_discharge(_tgt_ac_charge_power, _tgt_dc_charge_power):
+    """
+    Prevents the battery from discharging.
+    """
+    inverter_interface.set_mode_avoid_discharge()
+
+
+def set_fronius_mode_discharge_allowed(_tgt_ac_charge_power, tgt_dc_charge_power):
+    """
+    Limits the PV charge rate to the target DC charge power and allows the
+    battery to discharge.
+    """
+    inverter_interface.api_set_max_pv_charge_rate(tgt_dc_charge_power)
+    inverter_interface.set_mode_allow_discharge()
+
+
+# battery mode -> fronius setter called with (tgt_ac_charge_power, tgt_dc_charge_power)
+FRONIUS_MODE_SETTERS = {
+    "force_charge": set_fronius_mode_force_charge,
+    "avoid_discharge": set_fronius_mode_avoid_discharge,
+    "discharge_allowed": set_fronius_mode_discharge_allowed,
+}
+
+
+@lru_cache(maxsize=8)
+def format_override_end_time(override_end_time):
+    """
+    Returns the override end time (epoch seconds) as local ISO string. The end
+    time only changes when an override is set, so the strings are cached.
+    """
+    return datetime.fromtimestamp(override_end_time, time_zone).isoformat()
+
+
+# overall state number -> (battery mode, log pattern)
+CONTROL_STATE_MODES = {
+    0: ("force_charge", "_____|||||_____"),  # MODE_CHARGE_FROM_GRID
+    1: ("avoid_discharge", "_____-----_____"),  # MODE_AVOID_DISCHARGE
+    2: ("discharge_allowed", "_____+++++_____"),  # MODE_DISCHARGE_ALLOWED
+    3: ("avoid_discharge", "_____+---+_____"),  # MODE_AVOID_DISCHARGE_EVCC_FAST
+    4: ("discharge_allowed", "_____-+++-_____"),  # MODE_DISCHARGE_ALLOWED_EVCC_PV
+    5: ("discharge_allowed", "_____+-+-+_____"),  # MODE_DISCHARGE_ALLOWED_EVCC_MIN_PV
+}
+
+
 def change_control_state():
     """
     Adjusts the control state of the inverter based on the current overall state.
@@ -884,21 +1034,14 @@ def change_control_state():
         bool: True if the state was changed recently and an action was performed,
               False otherwise.
     """
-    inverter_fronius_en = False
-    inverter_evcc_en = False
-    if inverter_type in ["fronius_gen24", "fronius_gen24_legacy"]:
-        inverter_fronius_en = True
-    elif config_manager.config["inverter"]["type"] == "evcc":
-        inverter_evcc_en = True
-
     current_overall_state = base_control.get_current_overall_state_number()
     current_overall_state_text = base_control.get_current_overall_state()
+    override_active, override_end_time = base_control.get_override_active_and_endtime()
+    max_charge_power = battery_interface.get_max_charge_power()
 
     mqtt_interface.update_publish_topics(
         {
-            "control/overall_state": {
-                "value": base_control.get_current_overall_state_number()
-            },
+            "control/overall_state": {"value": current_overall_state},
             "optimization/state": {
                 "value": optimization_scheduler.get_current_state()["request_state"]
             },
@@ -906,15 +1049,9 @@ def change_control_state():
             # "control/override_charge_power": {
             #     "value": base_control.get_current_ac_charge_demand()
             # },
-            "control/override_active": {
-                "value": base_control.get_override_active_and_endtime()[0]
-            },
+            "control/override_active": {"value": override_active},
             "control/override_end_time": {
-                "value": (
-                    datetime.fromtimestamp(
-                        base_control.get_override_active_and_endtime()[1], time_zone
-                    )
-                ).isoformat()
+                "value": format_override_end_time(override_end_time)
             },
             "control/eos_homeappliance_released": {
                 "value": eos_interface.get_home_appliance_released()
@@ -926,9 +1063,7 @@ def change_control_state():
             "battery/remaining_energy": {
                 "value": battery_interface.get_current_usable_capacity()
             },
-            "battery/dyn_max_charge_power": {
-                "value": battery_interface.get_max_charge_power()
-            },
+            "battery/dyn_max_charge_power": {"value": max_charge_power},
             "status": {"value": "online"},
         }
     )
@@ -936,12 +1071,10 @@ def change_control_state():
     # get the current ac/dc charge demand and for setting to inverter according
     # to the max dynamic charge power of the battery based on SOC
     tgt_ac_charge_power = min(
-        base_control.get_current_ac_charge_demand(),
-        round(battery_interface.get_max_charge_power()),
+        base_control.get_current_ac_charge_demand(), round(max_charge_power)
     )
     tgt_dc_charge_power = min(
-        base_control.get_current_dc_charge_demand(),
-        round(battery_interface.get_max_charge_power()),
+        base_control.get_current_dc_charge_demand(), round(max_charge_power)
     )
 
     base_control.set_current_bat_charge_max(
@@ -951,76 +1084,35 @@ def change_control_state():
     # Check if the overall state of the inverter was changed recently
     if base_control.was_overall_state_changed_recently():
         logger.debug("[Main] Overall state changed recently")
-        # MODE_CHARGE_FROM_GRID
-        if current_overall_state == 0:
-            if inverter_fronius_en:
-                inverter_interface.set_mode_force_charge(tgt_ac_charge_power)
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("force_charge")
-            logger.info(
-                "[Main] Inverter mode set to %s with %s W (_____|||||_____)",
-                current_overall_state_text,
-                tgt_ac_charge_power,
-            )
-        # MODE_AVOID_DISCHARGE
-        elif current_overall_state == 1:
-            if inverter_fronius_en:
-                inverter_interface.set_mode_avoid_discharge()
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("avoid_discharge")
-            logger.info(
-                "[Main] Inverter mode set to %s (_____-----_____)",
-                current_overall_state_text,
-            )
-        # MODE_DISCHARGE_ALLOWED
-        elif current_overall_state == 2:
-            if inverter_fronius_en:
-                inverter_interface.api_set_max_pv_charge_rate(tgt_dc_charge_power)
-                inverter_interface.set_mode_allow_discharge()
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("discharge_allowed")
-            logger.info(
-                "[Main] Inverter mode set to %s (_____+++++_____)",
-                current_overall_state_text,
-            )
-        # MODE_AVOID_DISCHARGE_EVCC_FAST
-        elif current_overall_state == 3:
-            if inverter_fronius_en:
-                inverter_interface.set_mode_avoid_discharge()
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("avoid_discharge")
-            logger.info(
-                "[Main] Inverter mode set to %s (_____+---+_____)",
-                current_overall_state_text,
-            )
-        # MODE_DISCHARGE_ALLOWED_EVCC_PV
-        elif current_overall_state == 4:
-            if inverter_fronius_en:
-                inverter_interface.api_set_max_pv_charge_rate(tgt_dc_charge_power)
-                inverter_interface.set_mode_allow_discharge()
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("discharge_allowed")
-            logger.info(
-                "[Main] Inverter mode set to %s (_____-+++-_____)",
-                current_overall_state_text,
-            )
-        # MODE_DISCHARGE_ALLOWED_EVCC_MIN_PV
-        elif current_overall_state == 5:
-            if inverter_fronius_en:
-                inverter_interface.api_set_max_pv_charge_rate(tgt_dc_charge_power)
-                inverter_interface.set_mode_allow_discharge()
-            elif inverter_evcc_en:
-                evcc_interface.set_external_battery_mode("discharge_allowed")
-            logger.info(
-                "[Main] Inverter mode set to %s (_____+-+-+_____)",
-                current_overall_state_text,
-            )
+        control_mode = CONTROL_STATE_MODES.get(current_overall_state)
+        if control_mode is not None:
+            battery_mode, log_pattern = control_mode
+            if INVERTER_FRONIUS_EN:
+                FRONIUS_MODE_SETTERS[battery_mode](
+                    tgt_ac_charge_power, tgt_dc_charge_power
+                )
+            elif INVERTER_EVCC_EN:
+                evcc_interface.set_external_battery_mode(battery_mode)
+            if battery_mode == "force_charge":
+                logger.info(
+                    "[Main] Inverter mode set to %s with %s W (%s)",
+                    current_overall_state_text,
+                    tgt_ac_charge_power,
+                    log_pattern,
+                )
+            else:
+                logger.info(
+                    "[Main] Inverter mode set to %s (%s)",
+                    current_overall_state_text,
+                    log_pattern,
+                )
         elif current_overall_state < 0:
             logger.warning("[Main] Inverter mode not initialized yet")
         return True
 
     # Log the current state if no recent changes were made
-    if datetime.now().minute % 5 == 0 and datetime.now().second == 0:
+    now = datetime.now(time_zone)
+    if now.minute % 5 == 0 and now.second == 0:
         logger.info(
             "[Main] Overall state not changed recently"
             + " - remaining in current state: %s  (_____OOOOO_____)",
@@ -1038,17 +1130,33 @@ mqtt_interface.on_mqtt_command = mqtt_control_callback
 app = Flask(__name__)
 
 
+# browser cache time for the js/css assets - the index pages reference them with
+# the version as query string, so an update is fetched right away
+STATIC_ASSET_MAX_AGE = 86400
+STATIC_ASSET_REF = re.compile(rb'((?:src|href)="(?:js|css)/[\w\-.]+\.(?:js|css))"')
+
+
+def read_web_page(filename):
+    """
+    Reads a static html page from the 'web' directory. The pages contain no
+    template logic, so they are read once and served from memory.
+    """
+    with open(os.path.join(base_path, "web", filename), "rb") as html_file:
+        html = html_file.read()
+    return STATIC_ASSET_REF.sub(rb"\1?v=" + __version__.encode() + rb'"', html)
+
+
+INDEX_HTML = read_web_page("index.html")
+INDEX_LEGACY_HTML = read_web_page("index_legacy.html")
+
+
 # legacy web site support
 @app.route("/index_legacy.html", methods=["GET"])
 def main_page_legacy():
     """
-    Renders the main page of the web application.
-
-    This function reads the content of the 'index.html' file located in the 'web' directory
-    and returns it as a rendered template string.
+    Returns the legacy main page of the web application.
     """
-    with open(base_path + "/web/index_legacy.html", "r", encoding="utf-8") as html_file:
-        return render_template_string(html_file.read())
+    return Response(INDEX_LEGACY_HTML, mimetype="text/html")
 
 
 # new web site support
@@ -1057,71 +1165,61 @@ def main_page_legacy():
 @app.route("/", methods=["GET"])
 def main_page():
     """
-    Renders the main page of the web application.
-
-    This function reads the content of the 'index.html' file located in the 'web' directory
-    and returns it as a rendered template string.
+    Returns the main page of the web application.
     """
-    with open(base_path + "/web/index.html", "r", encoding="utf-8") as html_file:
-        return render_template_string(html_file.read())
+    return Response(INDEX_HTML, mimetype="text/html")
 
 
-@app.route("/js/<filename>")
-def serve_js_files(filename):
+def serve_web_asset(subdirectory, filename, mimetype):
     """
-    Dynamically serve JavaScript files from the js directory.
-    This allows adding new JS modules without modifying the server code.
+    Serves a js/css asset from the given 'web' subdirectory. send_from_directory
+    answers conditional requests with 304 and missing files with 404.
     """
+    suffix = "." + subdirectory
+    # Security check: only allow files of the asset type
+    if not filename.endswith(suffix):
+        logger.warning(
+            "[Web] Blocked attempt to serve non-%s file: %s", suffix, filename
+        )
+        return "Not Found", 404
     try:
-        js_directory = os.path.join(os.path.dirname(__file__), "web", "js")
-
-        # Security check: only allow .js files
-        if not filename.endswith(".js"):
-            logger.warning("[Web] Blocked attempt to serve non-JS file: %s", filename)
-            return "Not Found", 404
-
-        # Check if file exists
-        file_path = os.path.join(js_directory, filename)
-        if not os.path.exists(file_path):
-            logger.warning("[Web] JavaScript file not found: %s", filename)
-            return "Not Found", 404
-
-        # logger.debug("[Web] Serving JavaScript file: %s", filename)
         return send_from_directory(
-            js_directory, filename, mimetype="application/javascript"
+            os.path.join(base_path, "web", subdirectory),
+            filename,
+            mimetype=mimetype,
+            max_age=STATIC_ASSET_MAX_AGE,
         )
-
     except (OSError, IOError, ValueError) as e:
-        logger.error("[Web] Error serving JavaScript file %s: %s", filename, e)
+        logger.error("[Web] Error serving %s file %s: %s", suffix, filename, e)
         return "Server Error", 500
 
 
-# Also add CSS file serving for completeness
-@app.route("/css/<filename>")
-def serve_css_files(filename):
+@app.route("/js/<filename>")
+def serve_js_files(filename):
     """
-    Dynamically serve CSS files from the web directory.
+    Dynamically serve JavaScript files from the js directory.
+    This allows adding new JS modules without modifying the server code.
     """
-    try:
-        web_directory = os.path.join(os.path.dirname(__file__), "web", "css")
+    return serve_web_asset("js", filename, "application/javascript")
 
-        # Security check: only allow .css files
-        if not filename.endswith(".css"):
-            logger.warning("[Web] Blocked attempt to serve non-CSS file: %s", filename)
-            return "Not Found", 404
 
-        # Check if file exists
-        file_path = os.path.join(web_directory, filename)
-        if not os.path.exists(file_path):
-            logger.warning("[Web] CSS file not found: %s", filename)
-            return "Not Found", 404
+@app.route("/css/<filename>")
+def serve_css_files(filename):
+    """
+    Dynamically serve CSS files from the css directory.
+    """
+    return serve_web_asset("css", filename, "text/css")
 
-        # logger.debug("[Web] Serving CSS file: %s", filename)
-        return send_from_directory(web_directory, filename, mimetype="text/css")
 
-    except (OSError, IOError, ValueError) as e:
-        logger.error("[Web] Error serving CSS file %s: %s", filename, e)
-        return "Server Error", 500
+def conditional_json_response(json_data):
+    """
+    Returns the json with an ETag. The browser revalidates on every poll and gets
+    a bodyless 304 as long as the data did not change since the last optimization.
+    """
+    response = Response(json_data, content_type="application/json")
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @app.route("/json/optimize_request.json", methods=["GET"])
@@ -1129,9 +1227,8 @@ def get_optimize_request():
     """
     Retrieves the last optimization request and returns it as a JSON response.
     """
-    return Response(
-        optimization_scheduler.get_last_request_response()["request"],
-        content_type="application/json",
+    return conditional_json_response(
+        optimization_scheduler.get_last_request_response_json("request")
     )
 
 
@@ -1140,38 +1237,26 @@ def get_optimize_response():
     """
     Retrieves the last optimization response and returns it as a JSON response.
     """
-    return Response(
-        optimization_scheduler.get_last_request_response()["response"],
-        content_type="application/json",
+    return conditional_json_response(
+        optimization_scheduler.get_last_request_response_json("response")
     )
 
 
-@app.route("/json/optimize_request.test.json", methods=["GET"])
-def get_optimize_request_test():
-    """
-    Retrieves the last optimization request and returns it as a JSON response.
-    """
-    with open(
-        base_path + "/json/optimize_request.test.json", "r", encoding="utf-8"
-    ) as file:
-        return Response(
-            file.read(),
-            content_type="application/json",
-        )
+JSON_TEST_DIRECTORY = os.path.join(base_path, "json", "test")
 
 
-@app.route("/json/optimize_response.test.json", methods=["GET"])
-def get_optimize_response_test():
+@lru_cache(maxsize=16)
+def read_test_json_file(filename):
     """
-    Retrieves the last optimization response and returns it as a JSON response.
+    Reads a test json file from the json/test directory. The files do not change
+    at runtime, so they are kept in memory. Missing files raise
+    FileNotFoundError and are not cached.
     """
-    with open(
-        base_path + "/json/optimize_response.test.json", "r", encoding="utf-8"
-    ) as file:
-        return Response(
-            file.read(),
-            content_type="application/json",
-        )
+    file_path = safe_join(JSON_TEST_DIRECTORY, filename)
+    if file_path is None:
+        raise FileNotFoundError(filename)
+    with open(file_path, "rb") as json_file:
+        return json_file.read()
 
 
 @app.route("/json/current_controls.json", methods=["GET"])
@@ -1186,6 +1271,7 @@ def get_controls():
     base_control.set_current_battery_soc(current_battery_soc)
     current_inverter_mode = base_control.get_current_overall_state()
     current_inverter_mode_num = base_control.get_current_overall_state_number()
+    override_active, override_end_time = base_control.get_override_active_and_endtime()
 
     response_data = {
         "current_states": {
@@ -1194,8 +1280,8 @@ def get_controls():
             "current_discharge_allowed": current_discharge_allowed,
             "inverter_mode": current_inverter_mode,
             "inverter_mode_num": current_inverter_mode_num,
-            "override_active": base_control.get_override_active_and_endtime()[0],
-            "override_end_time": base_control.get_override_active_and_endtime()[1],
+            "override_active": override_active,
+            "override_end_time": override_end_time,
         },
         "evcc": {
             "charging_state": base_control.get_current_evcc_charging_state(),
@@ -1213,8 +1299,7 @@ def get_controls():
         "inverter": {
             "inverter_special_data": (
                 inverter_interface.get_inverter_current_data()
-                if inverter_type in ["fronius_gen24", "fronius_gen24_legacy"]
-                and inverter_interface is not None
+                if INVERTER_FRONIUS_EN and inverter_interface is not None
                 else None
             )
         },
@@ -1223,9 +1308,7 @@ def get_controls():
         "timestamp": datetime.now(time_zone).isoformat(),
         "api_version": "0.0.1",
     }
-    return Response(
-        json.dumps(response_data, indent=4), content_type="application/json"
-    )
+    return Response(json_dumps_compact(response_data), content_type="application/json")
 
 
 @app.route("/json/test/<filename>")
@@ -1236,9 +1319,6 @@ def serve_test_json_files(filename):
     Supports all test files like current_controls.test.json, optimize_request.test.json, etc.
     """
     try:
-        # Test files are in the json/test/ subdirectory
-        json_test_directory = os.path.join(os.path.dirname(__file__), "json", "test")
-
         # Security check: only allow .json files
         if not filename.endswith(".json"):
             logger.warning("[Web] Blocked attempt to serve non-JSON file: %s", filename)
@@ -1260,22 +1340,20 @@ def serve_test_json_files(filename):
                 content_type="application/json",
             )
 
-        # Check if file exists in test directory
-        file_path = os.path.join(json_test_directory, filename)
-        if not os.path.exists(file_path):
+        try:
+            # logger.info("[Web] Serving test JSON file: %s", filename)
+            return Response(
+                read_test_json_file(filename), content_type="application/json"
+            )
+        except FileNotFoundError:
             logger.warning("[Web] Test JSON file not found: %s", filename)
-            logger.debug("[Web] Looked in directory: %s", json_test_directory)
+            logger.debug("[Web] Looked in directory: %s", JSON_TEST_DIRECTORY)
             return Response(
                 '{"error": "Test file not found"}',
                 status=404,
                 content_type="application/json",
             )
 
-        # logger.info("[Web] Serving test JSON file: %s from %s", filename, json_test_directory)
-        return send_from_directory(
-            json_test_directory, filename, mimetype="application/json"
-        )
-
     except (OSError, IOError, ValueError) as e:
         logger.error("[Web] Error serving test JSON file %s: %s", filename, e)
         return Response(
@@ -1283,6 +1361,18 @@ def serve_test_json_files(filename):
         )
 
 
+# legacy urls of the optimize test files - registered under their own endpoints,
+# so requests to /json/test/<filename> are not redirected to them
+for legacy_test_file in ("optimize_request.test.json", "optimize_response.test.json"):
+    app.add_url_rule(
+        "/json/" + legacy_test_file,
+        endpoint="legacy_" + legacy_test_file.split(".")[0],
+        view_func=serve_test_json_files,
+        defaults={"filename": legacy_test_file},
+        methods=["GET"],
+    )
+
+
 @app.route("/controls/mode_override", methods=["POST"])
 def handle_mode_override():
     """
@@ -1312,41 +1402,21 @@ def handle_mode_override():
             )
 
         mode = int(data["mode"])
-        duration_string = data["duration"]  # 00:00, 00:30, 01:00 ...
-        duration_hh = duration_string.split(":")[0]
-        duration_mm = duration_string.split(":")[1]
-        duration = int(duration_hh) * 60 + int(duration_mm)
+        duration = parse_override_duration(data["duration"])  # 00:00, 00:30 ...
         grid_charge_power = float(data["grid_charge_power"])
+        # the web ui offers up to the max charge power of the battery - shown in
+        # kW with one decimal
+        max_grid_charge_power = (
+            math.ceil(config_manager.battery.max_charge_power_w / 100) / 10
+        )
 
-        # Validate mode and duration
-        if mode < -2 or mode > 2:
-            return Response(
-                json.dumps({"error": "Invalid mode value"}),
-                status=400,
-                content_type="application/json",
-            )
-        if duration <= 0 and duration <= 12 * 60:
-            return Response(
-                json.dumps(
-                    {
-                        "error": "Duration must be greater than 0 and less/ equal than 12 hours"
-                    }
-                ),
-                status=400,
-                content_type="application/json",
-            )
-        if (
-            grid_charge_power < 0.5
-            and grid_charge_power
-            <= config_manager.config["inverter"]["max_grid_charge_rate"] / 1000
-        ):
+        # Validate mode, duration and grid charge power
+        error = check_mode_override(
+            mode, duration, grid_charge_power, max_grid_charge_power
+        )
+        if error is not None:
             return Response(
-                json.dumps(
-                    {
-                        "error": "Grid charge power must be greater than 0"
-                        + " and less / equal than max grid charge rate"
-                    }
-                ),
+                json.dumps({"error": error}),
                 status=400,
                 content_type="application/json",
             )
@@ -1409,15 +1479,22 @@ def get_logs():
             level_filter=level_filter, limit=limit, since=since
         )
 
-        response_data = {
-            "logs": logs,
-            "total_count": len(logs),
-            "timestamp": datetime.now(time_zone).isoformat(),
-            "filters_applied": {"level": level_filter, "limit": limit, "since": since},
-        }
-
+        # the log list is streamed instead of serializing the whole response at once
         return Response(
-            json.dumps(response_data, indent=2), content_type="application/json"
+            iter_json_object_with_list(
+                "logs",
+                logs,
+                {
+                    "total_count": len(logs),
+                    "timestamp": datetime.now(time_zone).isoformat(),
+                    "filters_applied": {
+                        "level": level_filter,
+                        "limit": limit,
+                        "since": since,
+                    },
+                },
+            ),
+            content_type="application/json",
         )
 
     except (ValueError, TypeError, KeyError) as e:
@@ -1437,12 +1514,12 @@ def get_alerts():
     try:
         alerts = memory_handler.get_alerts()
 
-        # Group alerts by level for easier processing
-        grouped_alerts = {
-            "WARNING": [a for a in alerts if a["level"] == "WARNING"],
-            "ERROR": [a for a in alerts if a["level"] == "ERROR"],
-            "CRITICAL": [a for a in alerts if a["level"] == "CRITICAL"],
-        }
+        # Group alerts by level for easier processing - in a single pass
+        grouped_alerts = {"WARNING": [], "ERROR": [], "CRITICAL": []}
+        for alert in alerts:
+            level_alerts = grouped_alerts.get(alert["level"])
+            if level_alerts is not None:
+                level_alerts.append(alert)
 
         response_data = {
             "alerts": alerts,
@@ -1454,7 +1531,7 @@ def get_alerts():
         }
 
         return Response(
-            json.dumps(response_data, indent=2), content_type="application/json"
+            json_dumps_compact(response_data), content_type="application/json"
         )
 
     except (ValueError, TypeError, KeyError) as e:
@@ -1526,7 +1603,7 @@ def get_log_stats():
         }
 
         return Response(
-            json.dumps(response_data, indent=2), content_type="application/json"
+            json_dumps_compact(response_data), content_type="application/json"
         )
 
     except (ValueError, TypeError, KeyError) as e:
@@ -1538,65 +1615,132 @@ def get_log_stats():
         )
 
 
-if __name__ == "__main__":
+WEB_SERVER_GRACE_TIME = 2  # seconds for running requests before they are killed
+INTERFACE_SHUTDOWN_TIMEOUT = 10  # seconds for all interfaces together
+
+
+def shutdown_interface(name, interface):
+    """
+    Shuts down one interface and logs the error if it fails, so the other
+    interfaces are still stopped.
+    """
+    try:
+        interface.shutdown()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("[Main] Error while shutting down %s interface: %s", name, e)
+
+
+def shutdown_eos_connect(http_server):
+    """
+    Stops the scheduler loops, the web server and all interfaces.
+    """
+    # stop the web server first - no new requests may re-enter the interfaces
+    # that are torn down below
+    if http_server and not http_server.closed:
+        http_server.stop(timeout=WEB_SERVER_GRACE_TIME)
+        logger.info("[Main] HTTP server stopped")
+    optimization_scheduler.shutdown()
+    base_control.shutdown()
+
+    # the interfaces are independent and each waits for its own thread or
+    # device - stop them concurrently in daemon threads, so the slowest one sets
+    # the duration and a hanging one (e.g. unreachable device) cannot block the exit
+    shutdown_threads = []
+    for name, interface in reversed(shutdown_registry):
+        shutdown_thread = threading.Thread(
+            target=shutdown_interface,
+            args=(name, interface),
+            name="shutdown_" + name,
+            daemon=True,
+        )
+        shutdown_thread.start()
+        shutdown_threads.append(shutdown_thread)
+    deadline = time.monotonic() + INTERFACE_SHUTDOWN_TIMEOUT
+    for shutdown_thread in shutdown_threads:
+        shutdown_thread.join(max(0, deadline - time.monotonic()))
+        if shutdown_thread.is_alive():
+            logger.warning(
+                "[Main] %s exceeded %s s - abandoned",
+                shutdown_thread.name,
+                INTERFACE_SHUTDOWN_TIMEOUT,
+            )
+    logger.info("[Main] Server stopped gracefully")
+    logger.info("[Main] Cleanup complete. Goodbye!")
+
+
+def stop_web_server(http_server, signal_name):
+    """
+    Signal handler - closes the web server, which makes serve_forever() return
+    and the shutdown run in the main greenlet.
+    """
+    logger.info("[Main] Shutting down EOS Connect (%s received)", signal_name)
+    http_server.close()
+
+
+def run_eos_connect():
+    """
+    Runs the web server until it is stopped by SIGTERM or Ctrl-C and shuts
+    everything down afterwards.
+
+    Returns:
+        int: The process exit code - 0 after a regular shutdown, 1 if the web
+             server could not be started.
+    """
     http_server = None
     try:
         # Create web server with port checking
-        HOST = "0.0.0.0"
+        host = "0.0.0.0"
         desired_port = config_manager.config["eos_connect_web_port"]
 
         logger.info("[Main] Initializing EOS Connect web server...")
         http_server, actual_port = PortInterface.create_web_server_with_port_check(
-            HOST, desired_port, app, logger
+            host, desired_port, app, logger
         )
 
+        # Ctrl-C and SIGTERM (docker / home assistant add-on stop) close the
+        # server - serve_forever() then grants running requests the grace time
+        # and returns, so both take the same shutdown path
+        if os.name != "nt":
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                gevent.signal_handler(
+                    signum, stop_web_server, http_server, signal.Signals(signum).name
+                )
+
+        # Start serving
         logger.info(
-            "[Main] EOS Connect web server successfully created on %s:%s",
-            HOST,
+            "[Main] Starting EOS Connect web server on %s:%s"
+            + " - web interface available at: http://localhost:%s",
+            host,
+            actual_port,
             actual_port,
         )
-        logger.info(
-            "[Main] Web interface available at: http://localhost:%s", actual_port
-        )
+        http_server.serve_forever(stop_timeout=WEB_SERVER_GRACE_TIME)
 
-        # Start serving
-        logger.info("[Main] Starting EOS Connect web server...")
-        http_server.serve_forever()
+        shutdown_eos_connect(http_server)
+        return 0
 
     except RuntimeError as e:
         # PortInterface already provides detailed error messages and solutions
-        logger.error("[Main] %s", str(e))
-        logger.error("[Main] EOS Connect cannot start without its web interface.")
-        sys.exit(1)
+        logger.error(
+            "[Main] %s - EOS Connect cannot start without its web interface.", e
+        )
+        return 1
 
     except (OSError, ImportError) as e:
         # Only handle truly unexpected errors (not port-related)
-        logger.error("[Main] Unexpected error: %s", str(e))
-        logger.error("[Main] EOS Connect cannot start. Please check the logs.")
-        sys.exit(1)
+        logger.error(
+            "[Main] Unexpected error: %s - EOS Connect cannot start."
+            + " Please check the logs.",
+            e,
+        )
+        return 1
 
     except KeyboardInterrupt:
+        # only on windows - elsewhere SIGINT is handled by stop_web_server()
         logger.info("[Main] Shutting down EOS Connect (user requested)")
-        optimization_scheduler.shutdown()
-        base_control.shutdown()
-        if http_server:
-            http_server.stop()
-            logger.info("[Main] HTTP server stopped")
+        shutdown_eos_connect(http_server)
+        return 0
 
-        # restore the old config
-        if (
-            config_manager.config["inverter"]["type"]
-            in ["fronius_gen24", "fronius_gen24_v2"]
-            and inverter_interface is not None
-        ):
-            inverter_interface.shutdown()
-        pv_interface.shutdown()
-        price_interface.shutdown()
-        mqtt_interface.shutdown()
-        evcc_interface.shutdown()
-        battery_interface.shutdown()
-        logger.info("[Main] Server stopped gracefully")
-    finally:
-        logging.shutdown()  # This will call close() on all handlers
-        logger.info("[Main] Cleanup complete. Goodbye!")
-        sys.exit(0)
+
+if __name__ == "__main__":
+    sys.exit(run_eos_connect())
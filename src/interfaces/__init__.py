@@ -0,0 +1 @@
+"""Interfaces of EOS Connect to the connected devices and services."""
@@ -5,6 +5,7 @@ discharge permissions, and overall system state.
 """
 
 import logging
+import re
 import time
 import threading
 from datetime import datetime
@@ -30,6 +31,57 @@ state_mapping = {
     5: "MODE DISCHARGE ALLOWED EVCC MIN+PV",
 }
 
+# duration of a mode override as HH:MM - 00:30, 01:00 ...
+OVERRIDE_DURATION_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})$")
+# longest mode override in minutes
+MAX_OVERRIDE_DURATION = 12 * 60
+# lowest grid charge power of a mode override in kW
+MIN_OVERRIDE_GRID_CHARGE_POWER = 0.5
+
+
+def parse_override_duration(duration_string):
+    """
+    Converts the HH:MM duration of a mode override into minutes.
+
+    Raises:
+        ValueError: If the duration is not given as HH:MM.
+    """
+    duration_match = OVERRIDE_DURATION_PATTERN.match(str(duration_string))
+    if duration_match is None:
+        raise ValueError(f"invalid duration '{duration_string}'")
+    return int(duration_match[1]) * 60 + int(duration_match[2])
+
+
+def check_mode_override(mode, duration, grid_charge_power, max_grid_charge_power):
+    """
+    Checks the values of a mode override request.
+
+    Args:
+        mode (int): The requested mode, -2 switches back to EOS.
+        duration (int): The duration of the override in minutes.
+        grid_charge_power (float): The requested grid charge power in kW.
+        max_grid_charge_power (float): The highest accepted grid charge power in kW.
+
+    Returns:
+        str: The error message of the first invalid value, None if all are valid.
+    """
+    if mode < -2 or mode > 2:
+        return "Invalid mode value"
+    # back to EOS - the ui still sends its selected duration and grid charge power
+    if mode == -2:
+        return None
+    if duration <= 0 or duration > MAX_OVERRIDE_DURATION:
+        return "Duration must be greater than 0 and less/ equal than 12 hours"
+    if (
+        grid_charge_power < MIN_OVERRIDE_GRID_CHARGE_POWER
+        or grid_charge_power > max_grid_charge_power
+    ):
+        return (
+            "Grid charge power must be at least 0.5 kW"
+            + " and less / equal than max charge power"
+        )
+    return None
+
 
 class BaseControl:
     """
@@ -472,7 +524,7 @@ class BaseControl:
         """
         if self._update_thread and self._update_thread.is_alive():
             self._stop_event.set()
-            self._update_thread.join()
+            self._update_thread.join(timeout=5)
             logger.info("[BASE-CTRL] Update service stopped.")
 
     def __update_base_control_loop(self):
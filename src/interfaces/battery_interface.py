@@ -63,8 +63,10 @@ class BatteryInterface:
             Fetches the current SOC of the battery based on the configured source.
     """
 
-    def __init__(self, config, on_bat_max_changed=None):
+    def __init__(self, config, on_bat_max_changed=None, session=None):
         self.src = config.get("source", "default")
+        # shared keep-alive session, falls back to a private one if none is given
+        self.session = session if session is not None else requests.Session()
         self.url = config.get("url", "")
         self.soc_sensor = config.get("soc_sensor", "")
         self.access_token = config.get("access_token", "")
@@ -98,7 +100,7 @@ class BatteryInterface:
         openhab_url = self.url + "/rest/items/" + self.soc_sensor
         soc = 5  # Default SOC value in case of error
         try:
-            response = requests.get(openhab_url, timeout=6)
+            response = self.session.get(openhab_url, timeout=6)
             response.raise_for_status()
             data = response.json()
             raw_state = str(data["state"]).strip()
@@ -150,7 +152,7 @@ class BatteryInterface:
         }
         soc = 5  # Default SOC value in case of error
         try:
-            response = requests.get(homeassistant_url, headers=headers, timeout=6)
+            response = self.session.get(homeassistant_url, headers=headers, timeout=6)
             response.raise_for_status()
             entity_data = response.json()
             soc = float(entity_data["state"])
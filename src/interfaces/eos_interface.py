@@ -26,11 +26,31 @@ from datetime import datetime, timedelta
 import requests
 import pandas as pd
 import numpy as np
+from .json_utils import json_dumps_bytes, json_loads_response
 
 logger = logging.getLogger("__main__")
 logger.info("[EOS] loading module ")
 
 
+def create_profile_table(profile):
+    """
+    Creates a lookup table month x weekday x hour from (month, weekday, hour,
+    energy) tuples - NaN where the profile has no value.
+    """
+    energy_table = np.full((12, 7, 24), np.nan)
+    for month, weekday, hour, energy in profile:
+        energy_table[month - 1, weekday, hour] = energy
+    return energy_table
+
+
+def get_profile_values(energy_table, dates):
+    """
+    Picks the value of every date from a table of create_profile_table() in
+    one step.
+    """
+    return energy_table[dates.month.values - 1, dates.weekday.values, dates.hour.values]
+
+
 # EOS_API_PUT_LOAD_SERIES = {
 #     f"http://{EOS_SERVER}:{EOS_SERVER_PORT}/v1/measurement/load-mr/series/by-name"  #
 # }  # ?name=Household
@@ -63,11 +83,13 @@ class EosInterface:
         eos_update_config_from_config_file():
     """
 
-    def __init__(self, eos_server, eos_port, timezone):
+    def __init__(self, eos_server, eos_port, timezone, session=None):
         self.eos_server = eos_server
         self.eos_port = eos_port
         self.base_url = f"http://{eos_server}:{eos_port}"
         self.time_zone = timezone
+        # shared keep-alive session, falls back to a private one if none is given
+        self.session = session if session is not None else requests.Session()
         self.last_start_solution = None
         self.home_appliance_released = False
         self.home_appliance_start_hour = None
@@ -105,7 +127,7 @@ class EosInterface:
         if isinstance(value, list):
             value = json.dumps(value)
         params = {"key": key, "value": value}
-        response = requests.put(
+        response = self.session.put(
             self.base_url + "/v1/config/value", params=params, timeout=10
         )
         response.raise_for_status()
@@ -117,16 +139,22 @@ class EosInterface:
         """
         Send the measurement data to the EOS server.
         """
-        params = {
-            "data": dataframe.to_json(orient="index"),
+        # the series goes into the request body - as a query parameter the whole
+        # json had to be url encoded and hit the url length limit for larger frames
+        series = {
+            "data": {
+                timestamp.isoformat(): value
+                for timestamp, value in dataframe["Household"].dropna().items()
+            },
             "dtype": "float64",
             "tz": "UTC",
         }
-        response = requests.put(
+        response = self.session.put(
             self.base_url
             + "/v1/measurement/load-mr/series/by-name"
             + "?name=Household",
-            params=params,
+            data=json_dumps_bytes(series),
+            headers={"Content-Type": "application/json"},
             timeout=10,
         )
         response.raise_for_status()
@@ -158,8 +186,11 @@ class EosInterface:
         response = None  # Initialize response variable
         try:
             start_time = time.time()
-            response = requests.post(
-                request_url, headers=headers, json=payload, timeout=timeout
+            response = self.session.post(
+                request_url,
+                headers=headers,
+                data=json_dumps_bytes(payload),
+                timeout=timeout,
             )
             end_time = time.time()
             elapsed_time = end_time - start_time
@@ -187,7 +218,7 @@ class EosInterface:
             #     self.last_optimization_runtimes,
             # )
             avg_runtime = sum(self.last_optimization_runtimes) / 5
-            return response.json(), avg_runtime
+            return json_loads_response(response), avg_runtime
         except requests.exceptions.Timeout:
             logger.error("[EOS] OPTIMIZE Request timed out after %s seconds", timeout)
             return {"error": "Request timed out - trying again with next run"}
@@ -219,6 +250,10 @@ class EosInterface:
                 payload,
             )
             return {"error": str(e)}
+        except ValueError as e:
+            # invalid json in the response (orjson does not raise a requests error)
+            logger.error("[EOS] OPTIMIZE Invalid response: %s", e)
+            return {"error": str(e)}
 
     def examine_response_to_control_data(self, optimized_response_in):
         """
@@ -341,7 +376,7 @@ class EosInterface:
         """
         Save the current configuration to the configuration file on the EOS server.
         """
-        response = requests.put(self.base_url + "/v1/config/file", timeout=10)
+        response = self.session.put(self.base_url + "/v1/config/file", timeout=10)
         response.raise_for_status()
         logger.debug("[EOS] CONFIG saved to config file successfully.")
 
@@ -350,7 +385,9 @@ class EosInterface:
         Update the current configuration from the configuration file on the EOS server.
         """
         try:
-            response = requests.post(self.base_url + "/v1/config/update", timeout=10)
+            response = self.session.post(
+                self.base_url + "/v1/config/update", timeout=10
+            )
             response.raise_for_status()
             logger.info("[EOS] CONFIG Config updated from config file successfully.")
         except requests.exceptions.Timeout:
@@ -409,7 +446,7 @@ class EosInterface:
         return self.home_appliance_start_hour
 
     # function that creates a pandas dataframe with a DateTimeIndex with the given average profile
-    def create_dataframe(self, profile):
+    def create_dataframe(self, profile, dates=None):
         """
         Creates a pandas DataFrame with hourly energy values for a given profile.
 
@@ -419,34 +456,20 @@ class EosInterface:
                 - weekday (int): The day of the week (0=Monday, 6=Sunday).
                 - hour (int): The hour of the day (0-23).
                 - energy (float): The energy value to set.
+            dates (pandas.DatetimeIndex, optional): The hours to create values for.
+                Defaults to every hour of the year 2025.
 
         Returns:
-            pandas.DataFrame: A DataFrame with a DateTime index for the year 2025 and a 'Household'
+            pandas.DataFrame: A DataFrame with a DateTime index and a 'Household'
             column containing the energy values from the profile.
         """
-
-        # create a list of all dates in the year
-        dates = pd.date_range(start="1/1/2025", end="31/12/2025", freq="H")
-        # create an empty dataframe with the dates as index
-        df = pd.DataFrame(index=dates)
-        # add a column 'Household' to the dataframe with NaN values
-        df["Household"] = np.nan
-        # iterate over the profile and set the energy values in the dataframe
-        for entry in profile:
-            month = entry[0]
-            weekday = entry[1]
-            hour = entry[2]
-            energy = entry[3]
-            # get the dates that match the month, weekday and hour
-            dates = df[
-                (df.index.month == month)
-                & (df.index.weekday == weekday)
-                & (df.index.hour == hour)
-            ].index
-            # set the energy value for the dates
-            for date in dates:
-                df.loc[date, "Household"] = energy
-        return df
+        if dates is None:
+            # create a list of all dates in the year
+            dates = pd.date_range(start="1/1/2025", end="31/12/2025", freq="h")
+        energy_table = create_profile_table(profile)
+        return pd.DataFrame(
+            {"Household": get_profile_values(energy_table, dates)}, index=dates
+        )
 
     def __retrieve_eos_version(self):
         """
@@ -457,7 +480,7 @@ class EosInterface:
             str: The EOS version.
         """
         try:
-            response = requests.get(self.base_url + "/v1/health", timeout=10)
+            response = self.session.get(self.base_url + "/v1/health", timeout=10)
             response.raise_for_status()
             eos_version = response.json().get("status")
             if eos_version == "alive":
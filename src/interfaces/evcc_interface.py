@@ -70,7 +70,12 @@ class EvccInterface:
     """
 
     def __init__(
-        self, url, ext_bat_mode=False, update_interval=15, on_charging_state_change=None
+        self,
+        url,
+        ext_bat_mode=False,
+        update_interval=15,
+        on_charging_state_change=None,
+        session=None,
     ):
         """
         Initializes the EVCC interface and starts the update service.
@@ -82,8 +87,11 @@ class EvccInterface:
             the charging state. Defaults to 15.
             on_charging_state_change (callable, optional): A callback function to be called
             when the charging state or mode changes. Defaults to None.
+            session (requests.Session, optional): Shared HTTP session used for all
+            EVCC requests. Defaults to a private session.
         """
         self.url = url
+        self.session = session if session is not None else requests.Session()
         self.last_known_charging_state = False
         # off, pv, pvmin, now
         self.last_known_charging_mode = None
@@ -142,7 +150,7 @@ class EvccInterface:
             return 2
         # check reachability of the EVCC server
         try:
-            response = requests.get(self.url, timeout=5)
+            response = self.session.get(self.url, timeout=5)
             if response.status_code != 200:
                 logger.error(
                     "[EVCC] Unable to reach EVCC server at %s. Status code: %s",
@@ -150,7 +158,7 @@ class EvccInterface:
                     response.status_code,
                 )
                 return False
-            response_api = requests.get(self.url + "/api/state", timeout=5)
+            response_api = self.session.get(self.url + "/api/state", timeout=5)
             # check if the first entry in JSON is "result"
             if response_api.status_code == 200:
                 if "result" in response_api.json():
@@ -440,7 +448,7 @@ class EvccInterface:
         evcc_url = self.url + "/api/state"
         # logger.debug("[EVCC] fetching evcc state with url: %s", evcc_url)
         try:
-            response = requests.get(evcc_url, timeout=6)
+            response = self.session.get(evcc_url, timeout=6)
             response.raise_for_status()
 
             if "result" in response.json():
@@ -491,7 +499,7 @@ class EvccInterface:
         """
         evcc_url = self.url + "/api/batterymode"
         try:
-            response = requests.delete(evcc_url, timeout=6)
+            response = self.session.delete(evcc_url, timeout=6)
             response.raise_for_status()
             logger.info("[EVCC] External battery mode disabled. response: %s", response)
         except requests.exceptions.RequestException as e:
@@ -527,7 +535,7 @@ class EvccInterface:
         """
         evcc_url = self.url + "/api/batterymode/hold"
         try:
-            response = requests.post(evcc_url, timeout=6)
+            response = self.session.post(evcc_url, timeout=6)
             response.raise_for_status()
             logger.debug(
                 "[EVCC] External battery mode set AVOID DISCHARGE. response: %s",
@@ -545,7 +553,7 @@ class EvccInterface:
         """
         evcc_url = self.url + "/api/batterymode/normal"
         try:
-            response = requests.post(evcc_url, timeout=6)
+            response = self.session.post(evcc_url, timeout=6)
             response.raise_for_status()
             logger.debug(
                 "[EVCC] External battery mode set DISCHARGE ALLOWED. response: %s",
@@ -563,7 +571,7 @@ class EvccInterface:
         """
         evcc_url = self.url + "/api/batterymode/charge"
         try:
-            response = requests.post(evcc_url, timeout=6)
+            response = self.session.post(evcc_url, timeout=6)
             response.raise_for_status()
             logger.debug(
                 "[EVCC] External battery mode set FORCE CHARGE. response: %s", response
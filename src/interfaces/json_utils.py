@@ -0,0 +1,77 @@
+"""
+This module provides the json helpers shared by EOS Connect and its interfaces.
+orjson is used if it is installed - otherwise, and for types orjson cannot
+handle, the helpers fall back to the stdlib json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to the stdlib json module
+
+
+def json_loads_response(response):
+    """
+    Parses the json body of a response directly from its bytes - with orjson
+    if it is installed, otherwise with response.json().
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def json_dumps_bytes(data):
+    """
+    Serializes data to compact utf-8 encoded json for a request body.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def json_dumps_compact(data):
+    """
+    Serializes data to a compact json string for the web api responses.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(data, separators=(",", ":"))
+
+
+def json_dumps_pretty(data):
+    """
+    Serializes data to an indented json string.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2)
+
+
+def iter_json_object_with_list(list_key, items, fields, batch_size=100):
+    """
+    Yields a json object with a (large) list under list_key followed by the given
+    fields in chunks, so the whole document is never built as one string. The
+    list entries are serialized in batches to keep the number of writes low.
+    """
+    yield '{"' + list_key + '":['
+    for start in range(0, len(items), batch_size):
+        yield ("," if start else "") + ",".join(
+            json_dumps_compact(item) for item in items[start : start + batch_size]
+        )
+    yield "]"
+    for key, value in fields.items():
+        yield "," + json_dumps_compact(key) + ":" + json_dumps_compact(value)
+    yield "}"
@@ -4,16 +4,82 @@ from various sources such as OpenHAB and Home Assistant. It also includes method
 load profiles based on historical energy consumption data.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import logging
 from urllib.parse import quote
 import zoneinfo
 import requests
 import pytz
+import numpy as np
+from .json_utils import json_loads_response
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
 
 logger = logging.getLogger("__main__")
 logger.info("[LOAD-IF] loading module ")
 
+# concurrent history requests while creating a day load profile
+LOAD_FETCH_WORKERS = 8
+# fetched histories of past days are kept this long - a profile reaches two
+# weeks back
+LOAD_HISTORY_CACHE_DAYS = 15
+# default load profile of two days in Wh per hour - used while no history is
+# available
+DEFAULT_LOAD_PROFILE = (
+    200.0,  # 0:00 - 1:00 -- day 1
+    200.0,  # 1:00 - 2:00
+    200.0,  # 2:00 - 3:00
+    200.0,  # 3:00 - 4:00
+    200.0,  # 4:00 - 5:00
+    300.0,  # 5:00 - 6:00
+    350.0,  # 6:00 - 7:00
+    400.0,  # 7:00 - 8:00
+    350.0,  # 8:00 - 9:00
+    300.0,  # 9:00 - 10:00
+    300.0,  # 10:00 - 11:00
+    550.0,  # 11:00 - 12:00
+    450.0,  # 12:00 - 13:00
+    400.0,  # 13:00 - 14:00
+    300.0,  # 14:00 - 15:00
+    300.0,  # 15:00 - 16:00
+    400.0,  # 16:00 - 17:00
+    450.0,  # 17:00 - 18:00
+    500.0,  # 18:00 - 19:00
+    500.0,  # 19:00 - 20:00
+    500.0,  # 20:00 - 21:00
+    400.0,  # 21:00 - 22:00
+    300.0,  # 22:00 - 23:00
+    200.0,  # 23:00 - 0:00
+    200.0,  # 0:00 - 1:00 -- day 2
+    200.0,  # 1:00 - 2:00
+    200.0,  # 2:00 - 3:00
+    200.0,  # 3:00 - 4:00
+    200.0,  # 4:00 - 5:00
+    300.0,  # 5:00 - 6:00
+    350.0,  # 6:00 - 7:00
+    400.0,  # 7:00 - 8:00
+    350.0,  # 8:00 - 9:00
+    300.0,  # 9:00 - 10:00
+    300.0,  # 10:00 - 11:00
+    550.0,  # 11:00 - 12:00
+    450.0,  # 12:00 - 13:00
+    400.0,  # 13:00 - 14:00
+    300.0,  # 14:00 - 15:00
+    300.0,  # 15:00 - 16:00
+    400.0,  # 16:00 - 17:00
+    450.0,  # 17:00 - 18:00
+    500.0,  # 18:00 - 19:00
+    500.0,  # 19:00 - 20:00
+    500.0,  # 20:00 - 21:00
+    400.0,  # 21:00 - 22:00
+    300.0,  # 22:00 - 23:00
+    200.0,  # 23:00 - 0:00
+)
+
 
 class LoadInterface:
     """
@@ -26,13 +92,28 @@ class LoadInterface:
         self,
         config,
         tz_name=None,  # Changed default to None
+        session=None,
     ):
         self.src = config.get("source", "")
+        # shared keep-alive session, falls back to a private one if none is given
+        self.session = session if session is not None else requests.Session()
         self.url = config.get("url", "")
         self.load_sensor = config.get("load_sensor", "")
         self.car_charge_load_sensor = config.get("car_charge_load_sensor", "")
         self.additional_load_1_sensor = config.get("additional_load_1_sensor", "")
         self.access_token = config.get("access_token", "")
+        # sensor histories of past days by (sensor, start_time, end_time)
+        self.history_cache = {}
+        # persistence url of every configured OpenHAB item
+        self.openhab_item_urls = {
+            item: self.url + "/rest/persistence/items/" + item
+            for item in self.__get_profile_sensors()
+        }
+        # the same headers go with every Home Assistant history request
+        self.homeassistant_headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
 
         # Handle timezone properly
         if tz_name == "UTC" or tz_name is None:
@@ -69,14 +150,14 @@ class LoadInterface:
             self.src = "default"
             return False
         if self.src != "default":
-            if self.url == "":
+            if not self.url:
                 logger.error(
                     "[LOAD-IF] Source '%s' selected, but URL not configured. Using default.",
                     self.src,
                 )
                 self.src = "default"
                 return False
-            if self.access_token == "" and self.src == "homeassistant":
+            if not self.access_token and self.src == "homeassistant":
                 logger.error(
                     "[LOAD-IF] Source '%s' selected, but access_token not configured."
                     + " Using default.",
@@ -84,7 +165,7 @@ class LoadInterface:
                 )
                 self.src = "default"
                 return False
-            if self.load_sensor == "":
+            if not self.load_sensor:
                 logger.error("[LOAD-IF] Load sensor not configured. Using default.")
                 self.src = "default"
                 return False
@@ -100,12 +181,12 @@ class LoadInterface:
         """
         Fetch energy data from the specified OpenHAB item URL within the given time range.
         """
-        if openhab_item == "":
-            return {"data": []}
-        openhab_item_url = self.url + "/rest/persistence/items/" + openhab_item
+        if not openhab_item:
+            return []
+        openhab_item_url = self.openhab_item_urls[openhab_item]
         params = {"starttime": start_time.isoformat(), "endtime": end_time.isoformat()}
         try:
-            response = requests.get(openhab_item_url, params=params, timeout=10)
+            response = self.session.get(openhab_item_url, params=params, timeout=10)
             response.raise_for_status()
             # logger.debug(
             #     "[LOAD-IF] OPENHAB - Fetched data from %s to %s",
@@ -113,15 +194,15 @@ class LoadInterface:
             #     end_time.isoformat()
             # )
 
-            historical_data = (response.json())["data"]
-            # Extract only 'state' and 'last_updated' from the historical data
+            historical_data = json_loads_response(response)["data"]
+            # Extract only (state, last_updated) from the historical data
             filtered_data = [
-                {
-                    "state": entry["state"],
-                    "last_updated": datetime.fromtimestamp(
+                (
+                    entry["state"],
+                    datetime.fromtimestamp(
                         entry["time"] / 1000, tz=timezone.utc
                     ).isoformat(),
-                }
+                )
                 for entry in historical_data
             ]
             return filtered_data
@@ -129,12 +210,12 @@ class LoadInterface:
             logger.error(
                 "[LOAD-IF] OPENHAB - Request timed out while fetching energy data."
             )
-            return {"data": []}
-        except requests.exceptions.RequestException as e:
+            return []
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(
                 "[LOAD-IF] OPENHAB - Request failed while fetching energy data: %s", e
             )
-            return {"data": []}
+            return []
 
     def __fetch_historical_energy_data_from_homeassistant(
         self, entity_id, start_time, end_time
@@ -148,33 +229,37 @@ class LoadInterface:
             end_time (datetime): The end time for the historical data.
 
         Returns:
-            list: A list of historical state changes for the entity.
+            list: (state, last_updated) tuples of the state changes of the entity.
         """
-        if entity_id == "" or entity_id is None:
+        if not entity_id:
             # logger.debug("[LOAD-IF] HOMEASSISTANT get historical values"+
             # " - No entity_id configured.")
             return []
-        # Headers for the API request
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
-
         # API endpoint to get the history of the entity
         url = f"{self.url}/api/history/period/{start_time.isoformat()}"
 
         # Parameters for the API request
-        params = {"filter_entity_id": entity_id, "end_time": end_time.isoformat()}
+        # only state and time are used - leave out the attributes and the full
+        # state objects between the first and the last entry
+        params = {
+            "filter_entity_id": entity_id,
+            "end_time": end_time.isoformat(),
+            "minimal_response": "true",
+            "no_attributes": "true",
+        }
 
         # Make the API request
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.session.get(
+                url, headers=self.homeassistant_headers, params=params, timeout=10
+            )
             # Check if the request was successful
             if response.status_code == 200:
-                historical_data = response.json()
-                # Extract only 'state' and 'last_updated' from the historical data
+                historical_data = json_loads_response(response)
+                # Extract only (state, last_updated) from the historical data - a
+                # minimal response has only last_changed for the entries in between
                 filtered_data = [
-                    {"state": entry["state"], "last_updated": entry["last_updated"]}
+                    (entry["state"], entry["last_changed"])
                     for sublist in historical_data
                     for entry in sublist
                 ]
@@ -194,7 +279,7 @@ class LoadInterface:
                 entity_id,
             )
             return []
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(
                 "[LOAD-IF] HOMEASSISTANT - Request failed while fetching"
                 + " historical energy data for '%s' - error: %s",
@@ -203,70 +288,76 @@ class LoadInterface:
             )
             return []
 
-    def __process_energy_data(self, data, debug_sensor=None):
+    def __parse_history(self, sensor, entries):
         """
-        Processes energy data to calculate the average energy consumption based on timestamps.
+        Converts the (state, last_updated) samples of a sensor into two arrays - the
+        sample times as POSIX seconds and the states, NaN for a state that cannot
+        be used.
         """
-        total_energy = 0.0
-        total_duration = 0.0
-        current_state = 0.0
-        last_state = 0.0
-        current_time = datetime.now()
-        duration = 0.0
-
-        for i in range(len(data["data"]) - 1):
+        times = np.empty(len(entries))
+        states = np.empty(len(entries))
+        for index, (state, last_updated) in enumerate(entries):
+            entry_time = parse_datetime(last_updated)
+            times[index] = entry_time.timestamp()
             # check if data are available
-            if (
-                data["data"][i + 1]["state"] == "unavailable"
-                or data["data"][i]["state"] == "unavailable"
-            ):
-                # if debug_name != "add_load_1":
-                #     logger.error(
-                #         "[LOAD-IF] state 'unavailable' in data '%s' at index %d: %s",
-                #         debug_name if debug_name is not None else '',
-                #         i,
-                #         data["data"][i],
-                #     )
+            if state == "unavailable":
+                states[index] = np.nan
                 continue
             try:
-                current_state = float(data["data"][i]["state"])
-                last_state = float(data["data"][i + 1]["state"])
-                current_time = datetime.fromisoformat(data["data"][i]["last_updated"])
-                next_time = datetime.fromisoformat(data["data"][i + 1]["last_updated"])
-            except (ValueError, KeyError) as e:
+                states[index] = float(state)
+            except ValueError as e:
+                states[index] = np.nan
                 debug_url = None
                 if self.src == "homeassistant":
-                    current_time = datetime.fromisoformat(
-                        data["data"][i]["last_updated"]
-                    )
                     debug_url = (
                         "(check: "
                         + self.url
                         + "/history?entity_id="
-                        + quote(debug_sensor)
+                        + quote(sensor)
                         + "&start_date="
-                        + quote((current_time - timedelta(hours=2)).isoformat())
+                        + quote((entry_time - timedelta(hours=2)).isoformat())
                         + "&end_date="
-                        + quote((current_time + timedelta(hours=2)).isoformat())
+                        + quote((entry_time + timedelta(hours=2)).isoformat())
                         + ")"
                     )
                 logger.info(
                     "[LOAD-IF] Skipping invalid sensor data for '%s' at %s: state '%s' cannot be"
                     + " processed (%s). "
                     "This may indicate missing or corrupted data in the database. %s",
-                    debug_sensor if debug_sensor is not None else "unknown sensor",
-                    datetime.fromisoformat(data["data"][i]["last_updated"]).strftime(
-                        "%Y-%m-%d %H:%M:%S"
-                    ),
-                    data["data"][i]["state"],
+                    sensor,
+                    entry_time.strftime("%Y-%m-%d %H:%M:%S"),
+                    state,
                     str(e),
                     debug_url if debug_url is not None else "",
                 )
-                continue
+        return times, states
 
-            duration = (next_time - current_time).total_seconds()
-            total_energy += current_state * duration
-            total_duration += duration
+    def __process_energy_data(self, history):
+        """
+        Processes energy data to calculate the average energy consumption based on timestamps.
+
+        Args:
+            history (tuple): The sample times (POSIX seconds) and states as arrays.
+        """
+        times, states = history
+        total_energy = 0.0
+        total_duration = 0.0
+        last_state = 0.0
+        current_time = datetime.now()
+        duration = 0.0
+
+        # integrate state * duration over all pairs of usable samples at once
+        if len(times) > 1:
+            usable = ~np.isnan(states)
+            pairs = usable[:-1] & usable[1:]
+            if pairs.any():
+                durations = np.diff(times)[pairs]
+                total_energy = float(np.dot(states[:-1][pairs], durations))
+                total_duration = float(durations.sum())
+                # the start of the last pair and the state it ends with
+                last_pair = int(np.flatnonzero(pairs)[-1])
+                current_time = datetime.fromtimestamp(times[last_pair], tz=timezone.utc)
+                last_state = float(states[last_pair + 1])
         # add last data point to total energy calculation if duration is less than 1 hour
         if total_duration < 3600:
             duration = (
@@ -283,23 +374,15 @@ class LoadInterface:
 
     def __get_additional_load_list_from_to(self, item, start_time, end_time):
         """
-        Retrieves and processes additional load data within a specified time range.
-        This method fetches historical energy data for additional loads from Home Assistant,
-        determines the maximum additional load, and adjusts the unit of measurement if necessary.
-        The processed data is then returned with all values converted to the appropriate unit.
+        Retrieves the history of a sensor within a specified time range from the
+        configured source (OpenHAB or Home Assistant).
         Args:
+            item (str): The sensor to fetch the history for.
             start_time (datetime): The start time of the data retrieval period.
             end_time (datetime): The end time of the data retrieval period.
         Returns:
-            list[dict]: A list of dictionaries containing the processed additional load data.
-                        Each dictionary includes a "state" key with the adjusted load value.
-        Raises:
-            ValueError: If a data entry's "state" value cannot be converted to a float.
-            KeyError: If a data entry does not contain the "state" key.
-        Notes:
-            - If the maximum additional load is between 0 and 23 (assumed to be in kW), it is
-              converted to W.
-            - All load values are multiplied by the determined unit factor before being returned.
+            tuple: The (times, states) arrays from __parse_history - empty arrays if
+            the source is not supported.
         """
 
         if self.src == "openhab":
@@ -317,191 +400,291 @@ class LoadInterface:
                 "[LOAD-IF] Car Load source '%s' currently not supported. Using default.",
                 self.src,
             )
-            return []
+            additional_load_data = []
 
-        # multiply every value with car_load_unit_factor before returning
-        for data_entry in additional_load_data:
-            try:
-                data_entry["state"] = float(
-                    data_entry["state"]
-                )  # * car_load_unit_factor
-            except ValueError:
-                continue
-            except KeyError:
-                continue
-        # print(f'HA Car load data: {car_load_data}')
-        return additional_load_data
+        # the states are converted to float by __parse_history
+        return self.__parse_history(item, additional_load_data)
 
-    def __get_car_load_list_from_to(self, start_time, end_time):
+    def get_load_profile_for_day(self, start_time, end_time):
         """
-        Retrieves and processes car load data within a specified time range.
-        This method fetches historical energy data for car charging from Home Assistant,
-        determines the maximum car load, and adjusts the unit of measurement if necessary.
-        The processed data is then returned with all values converted to the appropriate unit.
+        Retrieves the load profile for a specific day by fetching energy data from Home Assistant.
+
         Args:
-            start_time (datetime): The start time of the data retrieval period.
-            end_time (datetime): The end time of the data retrieval period.
+            start_time (datetime): The start time for the load profile.
+            end_time (datetime): The end time for the load profile.
+
         Returns:
-            list[dict]: A list of dictionaries containing the processed car load data.
-                        Each dictionary includes a "state" key with the adjusted load value.
-        Raises:
-            ValueError: If a data entry's "state" value cannot be converted to a float.
-            KeyError: If a data entry does not contain the "state" key.
-        Notes:
-            - If the maximum car load is between 0 and 23 (assumed to be in kW), it is
-              converted to W.
-            - All load values are multiplied by the determined unit factor before being returned.
+            list: A list of energy consumption values for the specified day.
         """
+        return self.get_load_profiles_for_days([(start_time, end_time)])[0]
 
-        if self.src == "openhab":
-            car_load_data = self.__fetch_historical_energy_data_from_openhab(
-                self.car_charge_load_sensor, start_time, end_time
-            )
-        elif self.src == "homeassistant":
-            car_load_data = self.__fetch_historical_energy_data_from_homeassistant(
-                self.car_charge_load_sensor, start_time, end_time
-            )
-        else:
+    def get_load_profiles_for_days(self, days):
+        """
+        Retrieves the load profiles of several days with one batch of concurrent
+        requests, so the days do not wait for each other.
+
+        Args:
+            days (list of tuple): (start_time, end_time) of every day.
+
+        Returns:
+            list: One list of energy consumption values per day.
+        """
+        if self.src not in ("openhab", "homeassistant"):
             logger.error(
-                "[LOAD-IF] Car Load source '%s' currently not supported. Using default.",
+                "[LOAD-IF] Load source '%s' currently not supported. Using default.",
                 self.src,
             )
-            return []
+            return [[] for _ in days]
 
-        # multiply every value with car_load_unit_factor before returning
-        for data_entry in car_load_data:
-            try:
-                data_entry["state"] = float(
-                    data_entry["state"]
-                )  # * car_load_unit_factor
-            except ValueError:
-                continue
-            except KeyError:
-                continue
-        # print(f'HA Car load data: {car_load_data}')
-        return car_load_data
+        day_hours = []
+        for start_time, end_time in days:
+            logger.debug(
+                "[LOAD-IF] Creating day load profile from %s to %s",
+                start_time,
+                end_time,
+            )
+            hours = []
+            current_hour = start_time
+            while current_hour < end_time:
+                hours.append(current_hour)
+                current_hour += timedelta(hours=1)
+            day_hours.append(hours)
+        # both sources return all samples of a range in one response - fetch every
+        # sensor once per day and split the samples into the hours locally
+        day_histories = self.__fetch_day_histories(days)
+        load_profiles = []
+        for hours, day_history in zip(day_hours, day_histories):
+            # split the history of every sensor into the hours in one pass
+            hour_histories = {
+                sensor: self.__split_history_into_hours(history, hours)
+                for sensor, history in day_history.items()
+            }
+            load_profiles.append(
+                [
+                    self.__get_energy_for_hour(
+                        hour,
+                        {
+                            sensor: hour_entries[index]
+                            for sensor, hour_entries in hour_histories.items()
+                        },
+                    )
+                    for index, hour in enumerate(hours)
+                ]
+            )
+        return self.__check_load_profiles(days, load_profiles)
 
-    def get_load_profile_for_day(self, start_time, end_time):
+    def __check_load_profiles(self, days, load_profiles):
         """
-        Retrieves the load profile for a specific day by fetching energy data from Home Assistant.
+        Logs an error for every day without load profile data.
+        """
+        for (start_time, end_time), load_profile in zip(days, load_profiles):
+            if not load_profile:
+                logger.error(
+                    "[LOAD-IF] No load profile data available for the specified day"
+                    + " - % s to % s",
+                    start_time,
+                    end_time,
+                )
+        return load_profiles
+
+    def __get_profile_sensors(self):
+        """
+        Returns the configured sensors that are part of the load profile.
+        """
+        return [
+            sensor
+            for sensor in (
+                self.load_sensor,
+                self.car_charge_load_sensor,
+                self.additional_load_1_sensor,
+            )
+            if sensor
+        ]
+
+    def __fetch_day_histories(self, days):
+        """
+        Fetches the history of every profile sensor for the given days - days that
+        follow each other are requested as one range. Histories of days that are
+        already over do not change anymore - they are kept and reused by the
+        following runs.
 
         Args:
-            start_time (datetime): The start time for the load profile.
-            end_time (datetime): The end time for the load profile.
+            days (list of tuple): (start_time, end_time) of every day.
 
         Returns:
-            list: A list of energy consumption values for the specified day.
+            list: One dict per day mapping the sensor to a tuple of arrays of the
+            sample times (POSIX seconds) and the states.
         """
-        logger.debug(
-            "[LOAD-IF] Creating day load profile from %s to %s", start_time, end_time
-        )
-
-        load_profile = []
-        current_hour = start_time
-
-        while current_hour < end_time:
-            next_hour = current_hour + timedelta(hours=1)
-            # logger.debug("[LOAD-IF] Fetching data for %s to %s", current_hour, next_hour)
-            if self.src == "openhab":
-                energy_data = self.__fetch_historical_energy_data_from_openhab(
-                    self.load_sensor, current_hour, next_hour
-                )
-            elif self.src == "homeassistant":
-                energy_data = self.__fetch_historical_energy_data_from_homeassistant(
-                    self.load_sensor, current_hour, next_hour
-                )
-            else:
-                logger.error(
-                    "[LOAD-IF] Load source '%s' currently not supported. Using default.",
-                    self.src,
+        sensors = self.__get_profile_sensors()
+        now_ts = datetime.now(timezone.utc).timestamp()
+        # forget the days that are too old to be part of a profile again
+        oldest_ts = now_ts - timedelta(days=LOAD_HISTORY_CACHE_DAYS).total_seconds()
+        self.history_cache = {
+            key: history
+            for key, history in self.history_cache.items()
+            if key[2].timestamp() > oldest_ts
+        }
+        histories = dict(self.history_cache)
+        # missing days that follow each other are requested as one range
+        runs = []
+        for sensor in sensors:
+            missing_days = sorted(
+                {day for day in days if (sensor, *day) not in histories},
+                key=lambda day: day[0].timestamp(),
+            )
+            for day in missing_days:
+                if runs and runs[-1][0] == sensor and runs[-1][1][-1][1] == day[0]:
+                    runs[-1][1].append(day)
+                else:
+                    runs.append((sensor, [day]))
+        if runs:
+            with ThreadPoolExecutor(max_workers=LOAD_FETCH_WORKERS) as executor:
+                fetched = executor.map(
+                    self.__get_additional_load_list_from_to,
+                    [sensor for sensor, _ in runs],
+                    [run_days[0][0] for _, run_days in runs],
+                    [run_days[-1][1] for _, run_days in runs],
                 )
-                return []
+                for (sensor, run_days), history in zip(runs, fetched):
+                    boundaries = [start_time.timestamp() for start_time, _ in run_days]
+                    boundaries.append(run_days[-1][1].timestamp())
+                    run_histories = self.__split_history(history, boundaries)
+                    for day, history in zip(run_days, run_histories):
+                        key = (sensor, *day)
+                        histories[key] = history
+                        # an empty history may be a failed request - ask again
+                        if len(history[0]) and day[1].timestamp() <= now_ts:
+                            self.history_cache[key] = history
+        return [
+            {sensor: histories[(sensor, start_time, end_time)] for sensor in sensors}
+            for start_time, end_time in days
+        ]
 
-            car_load_energy = 0
-            # check if car load sensor is configured
-            if self.car_charge_load_sensor != "":
-                car_load_data = self.__get_additional_load_list_from_to(
-                    self.car_charge_load_sensor, current_hour, next_hour
-                )
-                car_load_energy = abs(
-                    self.__process_energy_data(
-                        {"data": car_load_data}, self.car_charge_load_sensor
-                    )
-                )
-            car_load_energy = max(car_load_energy, 0)  # prevent negative values
+    def __split_history_into_hours(self, history, hours):
+        """
+        Splits the fetched day history of a sensor into the samples of every hour.
 
-            add_load_data_1_energy = 0
-            # check if additional load 1 sensor is configured
-            if self.additional_load_1_sensor != "":
-                add_load_data_1 = self.__get_additional_load_list_from_to(
-                    self.additional_load_1_sensor, current_hour, next_hour
-                )
-                add_load_data_1_energy = abs(
-                    self.__process_energy_data(
-                        {"data": add_load_data_1}, self.additional_load_1_sensor
-                    )
-                )
-            add_load_data_1_energy = max(
-                add_load_data_1_energy, 0
-            )  # prevent negative values
+        Args:
+            history (tuple): The sample times (POSIX seconds) and states as arrays.
+            hours (list of datetime): The consecutive start times of the hours.
 
-            sum_controlable_energy_load = car_load_energy + add_load_data_1_energy
-            energy = abs(
-                self.__process_energy_data({"data": energy_data}, self.load_sensor)
-            )
+        Returns:
+            list: One tuple of the sample times and states per hour.
+        """
+        if not hours:
+            return []
+        boundaries = [hour.timestamp() for hour in hours]
+        boundaries.append((hours[-1] + timedelta(hours=1)).timestamp())
+        return self.__split_history(history, boundaries)
 
-            if sum_controlable_energy_load <= energy:
-                energy = energy - sum_controlable_energy_load
-            else:
-                debug_url = None
-                if self.src == "homeassistant":
-                    current_time = datetime.fromisoformat(current_hour.isoformat())
-                    debug_url = (
-                        "(check: "
-                        + self.url
-                        + "/history?entity_id="
-                        + quote(self.load_sensor)
-                        + "&start_date="
-                        + quote((current_time - timedelta(hours=2)).isoformat())
-                        + "&end_date="
-                        + quote((current_time + timedelta(hours=2)).isoformat())
-                        + " )"
-                    )
-                logger.warning(
-                    "[LOAD-IF] DATA ERROR load smaller than car load "
-                    + "- Energy for %s: %5.1f Wh (sum add energy %5.1f Wh - car load: %5.1f Wh) %s",
-                    current_hour,
-                    round(energy, 1),
-                    round(sum_controlable_energy_load, 1),
-                    round(car_load_energy, 1),
-                    debug_url,
-                )
-            if energy == 0:
-                logger.debug(
-                    "[LOAD-IF] load = 0 ... Energy for %s: %5.1f Wh"
-                    + " (sum add energy %5.1f Wh - car load: %5.1f Wh)",
-                    current_hour,
-                    round(energy, 1),
-                    round(sum_controlable_energy_load, 1),
-                    round(car_load_energy, 1),
-                )
+    def __split_history(self, history, boundaries):
+        """
+        Splits a history into the parts between consecutive boundaries.
+        Home Assistant starts the history of a range with the state at its start
+        time - the parts after the first one get this sample from the last state
+        before the part, as if the part was requested on its own.
 
-            load_profile.append(energy)
-            logger.debug(
-                "[LOAD-IF] Energy for %s: %5.1f Wh (sum add energy %5.1f Wh - car load: %5.1f Wh)",
+        Args:
+            history (tuple): The sample times (POSIX seconds) and states as arrays.
+            boundaries (list of float): The sorted boundaries as POSIX seconds.
+
+        Returns:
+            list: One tuple of the sample times and states per part.
+        """
+        times, states = history
+        # the samples are sorted by time - find all boundaries at once
+        indices = np.searchsorted(times, boundaries)
+        parts = []
+        for start_ts, start, end in zip(boundaries, indices, indices[1:]):
+            part_times = times[start:end]
+            part_states = states[start:end]
+            if (
+                self.src == "homeassistant"
+                and start > 0
+                and (start == end or times[start] > start_ts)
+            ):
+                part_times = np.concatenate(([start_ts], part_times))
+                part_states = np.concatenate(([states[start - 1]], part_states))
+            parts.append((part_times, part_states))
+        return parts
+
+    def __get_energy_for_hour(self, current_hour, hour_history):
+        """
+        Calculates the household energy of one hour - the load minus the car
+        charging and the additional load.
+
+        Args:
+            current_hour (datetime): The start of the hour.
+            hour_history (dict): The samples of the hour per sensor.
+
+        Returns:
+            float: The energy consumption of the hour in Wh.
+        """
+        energy_data = hour_history[self.load_sensor]
+
+        car_load_energy = 0
+        # check if car load sensor is configured
+        if self.car_charge_load_sensor:
+            car_load_data = hour_history[self.car_charge_load_sensor]
+            car_load_energy = abs(self.__process_energy_data(car_load_data))
+        car_load_energy = max(car_load_energy, 0)  # prevent negative values
+
+        add_load_data_1_energy = 0
+        # check if additional load 1 sensor is configured
+        if self.additional_load_1_sensor:
+            add_load_data_1 = hour_history[self.additional_load_1_sensor]
+            add_load_data_1_energy = abs(self.__process_energy_data(add_load_data_1))
+        add_load_data_1_energy = max(
+            add_load_data_1_energy, 0
+        )  # prevent negative values
+
+        sum_controlable_energy_load = car_load_energy + add_load_data_1_energy
+        energy = abs(self.__process_energy_data(energy_data))
+
+        if sum_controlable_energy_load <= energy:
+            energy = energy - sum_controlable_energy_load
+        else:
+            debug_url = None
+            if self.src == "homeassistant":
+                current_time = datetime.fromisoformat(current_hour.isoformat())
+                debug_url = (
+                    "(check: "
+                    + self.url
+                    + "/history?entity_id="
+                    + quote(self.load_sensor)
+                    + "&start_date="
+                    + quote((current_time - timedelta(hours=2)).isoformat())
+                    + "&end_date="
+                    + quote((current_time + timedelta(hours=2)).isoformat())
+                    + " )"
+                )
+            logger.warning(
+                "[LOAD-IF] DATA ERROR load smaller than car load "
+                + "- Energy for %s: %5.1f Wh (sum add energy %5.1f Wh - car load: %5.1f Wh) %s",
                 current_hour,
                 round(energy, 1),
                 round(sum_controlable_energy_load, 1),
                 round(car_load_energy, 1),
+                debug_url,
             )
-            current_hour += timedelta(hours=1)
-        if not load_profile:
-            logger.error(
-                "[LOAD-IF] No load profile data available for the specified day - % s to % s",
-                start_time,
-                end_time,
+        if energy == 0:
+            logger.debug(
+                "[LOAD-IF] load = 0 ... Energy for %s: %5.1f Wh"
+                + " (sum add energy %5.1f Wh - car load: %5.1f Wh)",
+                current_hour,
+                round(energy, 1),
+                round(sum_controlable_energy_load, 1),
+                round(car_load_energy, 1),
             )
-        return load_profile
+
+        logger.debug(
+            "[LOAD-IF] Energy for %s: %5.1f Wh (sum add energy %5.1f Wh - car load: %5.1f Wh)",
+            current_hour,
+            round(energy, 1),
+            round(sum_controlable_energy_load, 1),
+            round(car_load_energy, 1),
+        )
+        return energy
 
     def __create_load_profile_weekdays(self):
         """
@@ -520,20 +703,14 @@ class LoadInterface:
             now = datetime.now()
         else:
             now = datetime.now(self.time_zone)
+        # all days of the profile are taken relative to the same midnight
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        day_one_week_before = midnight - timedelta(days=7)
+        day_two_week_before = midnight - timedelta(days=14)
 
-        day_one_week_before = now.replace(
-            hour=0, minute=0, second=0, microsecond=0
-        ) - timedelta(days=7)
-        day_two_week_before = now.replace(
-            hour=0, minute=0, second=0, microsecond=0
-        ) - timedelta(days=14)
-
-        day_tomorrow_one_week_before = now.replace(
-            hour=0, minute=0, second=0, microsecond=0
-        ) - timedelta(days=6)
-        day_tomorrow_two_week_before = now.replace(
-            hour=0, minute=0, second=0, microsecond=0
-        ) - timedelta(days=13)
+        day_tomorrow_one_week_before = midnight - timedelta(days=6)
+        day_tomorrow_two_week_before = midnight - timedelta(days=13)
         logger.info(
             "[LOAD-IF] creating load profile for weekdays %s (%s) and %s (%s)",
             day_one_week_before,
@@ -542,23 +719,23 @@ class LoadInterface:
             day_tomorrow_one_week_before.strftime("%A"),
         )
 
-        # get load profile for day one week before
-        load_profile_one_week_before = self.get_load_profile_for_day(
-            day_one_week_before, day_one_week_before + timedelta(days=1)
-        )
-        # get load profile for day two week before
-        load_profile_two_week_before = self.get_load_profile_for_day(
-            day_two_week_before, day_two_week_before + timedelta(days=1)
-        )
-        # get load profile for day tomorrow one week before
-        load_profile_tomorrow_one_week_before = self.get_load_profile_for_day(
-            day_tomorrow_one_week_before,
-            day_tomorrow_one_week_before + timedelta(days=1),
-        )
-        # get load profile for day tomorrow two week before
-        load_profile_tomorrow_two_week_before = self.get_load_profile_for_day(
-            day_tomorrow_two_week_before,
-            day_tomorrow_two_week_before + timedelta(days=1),
+        # get the load profiles of the day and the following day one and two
+        # weeks before together
+        (
+            load_profile_one_week_before,
+            load_profile_two_week_before,
+            load_profile_tomorrow_one_week_before,
+            load_profile_tomorrow_two_week_before,
+        ) = self.get_load_profiles_for_days(
+            [
+                (day, day + timedelta(days=1))
+                for day in (
+                    day_one_week_before,
+                    day_two_week_before,
+                    day_tomorrow_one_week_before,
+                    day_tomorrow_two_week_before,
+                )
+            ]
         )
         # combine load profiles with average of the connected days and
         # combine to a list with 48 values
@@ -588,9 +765,7 @@ class LoadInterface:
                 + " more historical data."
             )
             # Get yesterday's load profile
-            yesterday = now.replace(
-                hour=0, minute=0, second=0, microsecond=0
-            ) - timedelta(days=1)
+            yesterday = midnight - timedelta(days=1)
             yesterday_profile = self.get_load_profile_for_day(
                 yesterday, yesterday + timedelta(days=1)
             )
@@ -637,21 +812,21 @@ class LoadInterface:
         """
         if self.src == "default":
             logger.info("[LOAD-IF] Using load source default")
-            return self._get_default_profile()[:tgt_duration]
+            return list(DEFAULT_LOAD_PROFILE[:tgt_duration])
         if self.src in ("openhab", "homeassistant"):
-            if self.load_sensor == "" or self.load_sensor is None:
+            if not self.load_sensor:
                 logger.error(
                     "[LOAD-IF] Load sensor not configured for source '%s'. Using default.",
                     self.src,
                 )
-                return self._get_default_profile()[:tgt_duration]
+                return list(DEFAULT_LOAD_PROFILE[:tgt_duration])
             return self.__create_load_profile_weekdays()
 
         logger.error(
             "[LOAD-IF] Load source '%s' currently not supported. Using default.",
             self.src,
         )
-        return self._get_default_profile()[:tgt_duration]
+        return list(DEFAULT_LOAD_PROFILE[:tgt_duration])
 
     def _get_default_profile(self):
         """
@@ -660,53 +835,4 @@ class LoadInterface:
         Returns:
             list: A list of 48 default energy consumption values.
         """
-        return [
-            200.0,  # 0:00 - 1:00 -- day 1
-            200.0,  # 1:00 - 2:00
-            200.0,  # 2:00 - 3:00
-            200.0,  # 3:00 - 4:00
-            200.0,  # 4:00 - 5:00
-            300.0,  # 5:00 - 6:00
-            350.0,  # 6:00 - 7:00
-            400.0,  # 7:00 - 8:00
-            350.0,  # 8:00 - 9:00
-            300.0,  # 9:00 - 10:00
-            300.0,  # 10:00 - 11:00
-            550.0,  # 11:00 - 12:00
-            450.0,  # 12:00 - 13:00
-            400.0,  # 13:00 - 14:00
-            300.0,  # 14:00 - 15:00
-            300.0,  # 15:00 - 16:00
-            400.0,  # 16:00 - 17:00
-            450.0,  # 17:00 - 18:00
-            500.0,  # 18:00 - 19:00
-            500.0,  # 19:00 - 20:00
-            500.0,  # 20:00 - 21:00
-            400.0,  # 21:00 - 22:00
-            300.0,  # 22:00 - 23:00
-            200.0,  # 23:00 - 0:00
-            200.0,  # 0:00 - 1:00 -- day 2
-            200.0,  # 1:00 - 2:00
-            200.0,  # 2:00 - 3:00
-            200.0,  # 3:00 - 4:00
-            200.0,  # 4:00 - 5:00
-            300.0,  # 5:00 - 6:00
-            350.0,  # 6:00 - 7:00
-            400.0,  # 7:00 - 8:00
-            350.0,  # 8:00 - 9:00
-            300.0,  # 9:00 - 10:00
-            300.0,  # 10:00 - 11:00
-            550.0,  # 11:00 - 12:00
-            450.0,  # 12:00 - 13:00
-            400.0,  # 13:00 - 14:00
-            300.0,  # 14:00 - 15:00
-            300.0,  # 15:00 - 16:00
-            400.0,  # 16:00 - 17:00
-            450.0,  # 17:00 - 18:00
-            500.0,  # 18:00 - 19:00
-            500.0,  # 19:00 - 20:00
-            500.0,  # 20:00 - 21:00
-            400.0,  # 21:00 - 22:00
-            300.0,  # 22:00 - 23:00
-            200.0,  # 23:00 - 0:00
-        ]
+        return list(DEFAULT_LOAD_PROFILE)
@@ -9,6 +9,9 @@ messages, and handling Home Assistant MQTT Auto Discovery configuration.
 
 import logging
 import json
+import threading
+import time
+from contextlib import contextmanager
 from typing import Optional
 from typing import Any, Dict
 from pathlib import Path
@@ -386,6 +389,12 @@ class MqttInterface:
             key: value.copy() if isinstance(value, dict) else value
             for key, value in self.topics_publish.items()
         }
+        # monotonic time of the last publish per topic - unchanged values are
+        # published again after republish_interval seconds as a keep-alive
+        self.topics_publish_last_time = {}
+        self.republish_interval = 600
+        # topics collected by batch(), kept per thread
+        self._batch = threading.local()
 
         # Set Last Will and Testament (LWT)
         self.client.will_set(self.base_topic + "/status", "offline", qos=1, retain=True)
@@ -607,13 +616,24 @@ class MqttInterface:
         logger.info("[MQTT] Stopping MQTT client loop.")
         self.client.loop_stop()
 
-    def __publish_topics_on_change(self):
+    def __publish_topics_on_change(self, topics=None):
         """
-        Publish topics if they have changed since the last publish.
+        Publish topics if they have changed since the last publish or were not
+        published for republish_interval seconds.
+
+        :param topics: Iterable of topic names to check (default: all topics)
         """
-        for topic, value in self.topics_publish.items():
-            # Check if the topic is in the last published topics and if the value has changed
-            if self.topics_publish_last[topic]["value"] != value["value"]:
+        if topics is None:
+            topics = self.topics_publish.keys()
+        now = time.monotonic()
+        for topic in topics:
+            value = self.topics_publish[topic]
+            # Check if the value has changed or was not published for a long time
+            if (
+                self.topics_publish_last[topic]["value"] != value["value"]
+                or now - self.topics_publish_last_time.get(topic, now)
+                > self.republish_interval
+            ):
                 # logger.debug("[MQTT] Topic '%s' has changed, publishing new value: %s",
                 # topic, value["value"])
                 self.__publish(
@@ -623,6 +643,25 @@ class MqttInterface:
                     value["retain"],
                 )
                 self.topics_publish_last[topic]["value"] = value["value"]
+                self.topics_publish_last_time[topic] = now
+
+    @contextmanager
+    def batch(self):
+        """
+        Collect all topic updates of the calling thread and publish the changed
+        ones together when the block is left.
+        """
+        if not self.enable_mqtt or getattr(self._batch, "topics", None) is not None:
+            # disabled or already inside a batch of this thread
+            yield
+            return
+        self._batch.topics = {}
+        try:
+            yield
+        finally:
+            topics = self._batch.topics
+            self._batch.topics = None
+            self.__publish_topics_on_change(topics)
 
     def update_publish_topics(self, topics):
         """
@@ -643,10 +682,12 @@ class MqttInterface:
                     self.port,
                 )
             return
+        updated_topics = []
         for topic, value in topics.items():
             if topic in self.topics_publish:
                 try:
                     self.topics_publish[topic]["value"] = value["value"]
+                    updated_topics.append(topic)
                 except KeyError as e:
                     logger.error(
                         "[MQTT] KeyError while updating publish topic => %s: %s",
@@ -655,7 +696,13 @@ class MqttInterface:
                     )
                 except (TypeError, ValueError) as e:
                     logger.error("[MQTT] Error while updating publish topics: %s", e)
-        self.__publish_topics_on_change()
+        batch_topics = getattr(self._batch, "topics", None)
+        if batch_topics is not None:
+            # published when the surrounding batch() is left
+            batch_topics.update(dict.fromkeys(updated_topics))
+            return
+        # only the topics of this batch can have changed since the last publish
+        self.__publish_topics_on_change(updated_topics)
 
     def __send_mqtt_discovery_messages(self) -> None:
         """Publish all offered mqtt discovery config messages"""
@@ -9,10 +9,15 @@ import os
 import subprocess
 from contextlib import closing
 import psutil
+from gevent.pool import Pool
 from gevent.pywsgi import WSGIServer
 
 logger = logging.getLogger(__name__)
 
+# upper bound of concurrently handled connections (one greenlet each) - the web
+# ui polls over keep-alive connections, further clients wait in the accept backlog
+MAX_WEB_CONNECTIONS = 200
+
 
 class PortInterface:
     """
@@ -263,6 +268,7 @@ class PortInterface:
                 app,
                 log=None,
                 error_log=logger_instance,
+                spawn=Pool(MAX_WEB_CONNECTIONS),
             )
 
             # Additional test binding (skip in HA add-on to avoid double binding issues)
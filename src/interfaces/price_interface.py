@@ -30,12 +30,10 @@ Usage:
 
 from datetime import datetime, timedelta
 from collections import defaultdict
-import json
 import logging
 import threading
 import requests
-
-
+from .json_utils import json_loads_response
 
 logger = logging.getLogger("__main__")
 logger.info("[PRICE-IF] loading module ")
@@ -88,8 +86,11 @@ class PriceInterface:
         self,
         config,
         timezone="UTC",
+        session=None,
     ):
         self.src = config["source"]
+        # shared keep-alive session, falls back to a private one if none is given
+        self.session = session if session is not None else requests.Session()
         self.access_token = config.get("token", "")
         self.fixed_price_adder_ct = config.get("fixed_price_adder_ct", 0.0)
         self.relative_price_multiplier = config.get("relative_price_multiplier", 0.0)
@@ -108,6 +109,8 @@ class PriceInterface:
         self.current_prices_direct = []  # without tax
         self.current_feedin = []
         self.default_prices = [0.0001] * 48  # if external data are not available
+        # (date, priceInfo) of the last complete tibber response
+        self.tibber_price_info_cache = None
 
         # Add retry mechanism attributes
         self.last_successful_prices = []
@@ -425,15 +428,15 @@ class PriceInterface:
         )
         logger.debug("[PRICE-IF] Requesting prices from akkudoktor: %s", request_url)
         try:
-            response = requests.get(request_url, timeout=10)
+            response = self.session.get(request_url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads_response(response)
         except requests.exceptions.Timeout:
             logger.error(
                 "[PRICE-IF] Request timed out while fetching prices from akkudoktor."
             )
             return []
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(
                 "[PRICE-IF] Request failed while fetching prices from akkudoktor: %s",
                 e,
@@ -451,11 +454,6 @@ class PriceInterface:
             )
             prices.append(price_final)
 
-        if start_time is None:
-            start_time = datetime.now(self.time_zone).replace(
-                minute=0, second=0, microsecond=0
-            )
-        current_hour = start_time.hour
         extended_prices = prices[current_hour : current_hour + tgt_duration]
 
         if len(extended_prices) < tgt_duration:
@@ -465,29 +463,14 @@ class PriceInterface:
         self.current_prices_direct = extended_prices.copy()
         return extended_prices
 
-    def __retrieve_prices_from_tibber(self, tgt_duration, start_time=None):
+    def __request_tibber_price_info(self):
         """
-        Fetches and processes electricity prices for today and tomorrow.
-
-        This function retrieves electricity prices for today and tomorrow from a web service,
-        processes the prices, and returns a list of prices for the specified duration starting
-        from the specified start time. If tomorrow's prices are not available, today's prices are
-        repeated for tomorrow.
-
-        Args:
-            tgt_duration (int): The target duration in hours for which the prices are needed.
-            start_time (datetime, optional): The start time for fetching prices. Defaults to None.
+        Requests the prices of today and tomorrow from the Tibber API.
 
         Returns:
-            list: A list of electricity prices for the specified duration starting
-                from the specified start time.
+            dict: The 'priceInfo' of the first home with the 'today' and 'tomorrow'
+                price lists, or None if the request failed.
         """
-        logger.debug("[PRICE-IF] Prices fetching from TIBBER started")
-        if self.src != "tibber":
-            logger.error(
-                "[PRICE-IF] Price source '%s' currently not supported.", self.src
-            )
-            return []  # Changed from self.default_prices to []
         headers = {
             "Authorization": self.access_token,
             "Content-Type": "application/json",
@@ -515,7 +498,7 @@ class PriceInterface:
         }
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 TIBBER_API, headers=headers, json={"query": query}, timeout=10
             )
             response.raise_for_status()
@@ -523,36 +506,65 @@ class PriceInterface:
             logger.error(
                 "[PRICE-IF] Request timed out while fetching prices from Tibber."
             )
-            return []  # Changed from self.default_prices to []
+            return None
         except requests.exceptions.RequestException as e:
             logger.error(
                 "[PRICE-IF] Request failed while fetching prices from Tibber: %s",
                 e,
             )
-            return []  # Changed from self.default_prices to []
+            return None
 
-        response.raise_for_status()
-        data = response.json()
+        data = json_loads_response(response)
         if "errors" in data and data["errors"] is not None:
             logger.error(
                 "[PRICE-IF] Error fetching prices - tibber API response: %s",
                 data["errors"][0]["message"],
             )
-            return []
+            return None
 
-        today_prices = json.dumps(
-            data["data"]["viewer"]["homes"][0]["currentSubscription"]["priceInfo"][
-                "today"
-            ]
-        )
-        tomorrow_prices = json.dumps(
-            data["data"]["viewer"]["homes"][0]["currentSubscription"]["priceInfo"][
-                "tomorrow"
-            ]
-        )
+        return data["data"]["viewer"]["homes"][0]["currentSubscription"]["priceInfo"]
+
+    def __retrieve_prices_from_tibber(self, tgt_duration, start_time=None):
+        """
+        Fetches and processes electricity prices for today and tomorrow.
+
+        This function retrieves electricity prices for today and tomorrow from a web service,
+        processes the prices, and returns a list of prices for the specified duration starting
+        from the specified start time. If tomorrow's prices are not available, today's prices are
+        repeated for tomorrow.
+
+        Args:
+            tgt_duration (int): The target duration in hours for which the prices are needed.
+            start_time (datetime, optional): The start time for fetching prices. Defaults to None.
 
-        today_prices_json = json.loads(today_prices)
-        tomorrow_prices_json = json.loads(tomorrow_prices)
+        Returns:
+            list: A list of electricity prices for the specified duration starting
+                from the specified start time.
+        """
+        logger.debug("[PRICE-IF] Prices fetching from TIBBER started")
+        if self.src != "tibber":
+            logger.error(
+                "[PRICE-IF] Price source '%s' currently not supported.", self.src
+            )
+            return []  # Changed from self.default_prices to []
+        # the prices of today and tomorrow only change once tomorrow's prices are
+        # published (early afternoon) - reuse them until the day changes
+        now = datetime.now(self.time_zone)
+        if start_time is None:
+            start_time = now.replace(minute=0, second=0, microsecond=0)
+        today = now.date()
+        if self.tibber_price_info_cache and self.tibber_price_info_cache[0] == today:
+            price_info = self.tibber_price_info_cache[1]
+            logger.debug("[PRICE-IF] Using cached TIBBER prices of today and tomorrow")
+        else:
+            price_info = self.__request_tibber_price_info()
+            if price_info is None:
+                return []
+            if price_info["tomorrow"]:
+                self.tibber_price_info_cache = (today, price_info)
+
+        today_prices_json = price_info["today"]
+        tomorrow_prices_json = price_info["tomorrow"]
         prices = []
         prices_direct = []
 
@@ -575,10 +587,6 @@ class PriceInterface:
                 prices_direct[:24]
             )  # Repeat today's prices for tomorrow
 
-        if start_time is None:
-            start_time = datetime.now(self.time_zone).replace(
-                minute=0, second=0, microsecond=0
-            )
         current_hour = start_time.hour
         extended_prices = prices[current_hour : current_hour + tgt_duration]
         extended_prices_direct = prices_direct[
@@ -610,15 +618,15 @@ class PriceInterface:
             "[PRICE-IF] Requesting prices from SMARTENERGY_AT: %s", request_url
         )
         try:
-            response = requests.get(request_url, timeout=10)
+            response = self.session.get(request_url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads_response(response)
         except requests.exceptions.Timeout:
             logger.error(
                 "[PRICE-IF] Request timed out while fetching prices from SMARTENERGY_AT."
             )
             return []
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(
                 "[PRICE-IF] Request failed while fetching prices from SMARTENERGY_AT: %s",
                 e,
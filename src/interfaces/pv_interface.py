@@ -22,6 +22,7 @@ Logging:
     and errors related to configuration, API requests, and background updates.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import threading
 import logging
@@ -36,11 +37,25 @@ import requests
 import pandas as pd
 import numpy as np
 from open_meteo_solar_forecast import OpenMeteoSolarForecast
+from .json_utils import json_loads_response
 
 logger = logging.getLogger("__main__")
 logger.info("[PV-IF] loading module ")
 
 EOS_API_GET_PV_FORECAST = "https://api.akkudoktor.net/forecast"
+# fields of an akkudoktor forecast entry that are evaluated
+AKKUDOKTOR_FORECAST_FIELDS = ("datetime", "power", "temperature")
+# pv config fields that make up a forecast request url
+FORECAST_REQUEST_FIELDS = (
+    "lat",
+    "lon",
+    "azimuth",
+    "tilt",
+    "power",
+    "powerInverter",
+    "inverterEfficiency",
+    "horizon",
+)
 
 
 class PvInterface:
@@ -55,8 +70,11 @@ class PvInterface:
         config,
         config_special,
         timezone="UTC",
+        session=None,
     ):
         self.config = config
+        # shared keep-alive session, falls back to a private one if none is given
+        self.session = session if session is not None else requests.Session()
         self.time_zone = timezone
         self.config_source = config_source
         self.config_special = config_special
@@ -75,6 +93,10 @@ class PvInterface:
             "source": None,
         }
         self.temp_forecast_array = [15] * 48
+        # pv config url parameters -> akkudoktor forecast request url
+        self.forecast_request_urls = {}
+        # request url -> (hour, values) of the last akkudoktor responses
+        self.akkudoktor_response_cache = {}
 
         self._update_thread = None
         self._stop_event = threading.Event()
@@ -293,31 +315,30 @@ class PvInterface:
 
     def __create_forecast_request(self, pv_config_entry):
         """
-        Creates a forecast request URL for the EOS server.
+        Creates a forecast request URL for the EOS server. The pv config does not
+        change at runtime, so the URL is built once per set of parameters.
         """
-        horizon_string = ""
-        if pv_config_entry["horizon"] != "":
-            horizon_string = "&horizont=" + str(pv_config_entry["horizon"])
-        return (
-            EOS_API_GET_PV_FORECAST
-            + "?lat="
-            + str(pv_config_entry["lat"])
-            + "&lon="
-            + str(pv_config_entry["lon"])
-            + "&azimuth="
-            + str(pv_config_entry["azimuth"])
-            + "&tilt="
-            + str(pv_config_entry["tilt"])
-            + "&power="
-            + str(pv_config_entry["power"])
-            + "&powerInverter="
-            + str(pv_config_entry["powerInverter"])
-            + "&inverterEfficiency="
-            + str(pv_config_entry["inverterEfficiency"])
-            + "&timezone="
-            + str(self.time_zone)
-            + horizon_string
+        # key on the url parameters - names may be missing or used twice
+        cache_key = tuple(
+            str(pv_config_entry[field]) for field in FORECAST_REQUEST_FIELDS
         )
+        url = self.forecast_request_urls.get(cache_key)
+        if url is None:
+            horizon_string = ""
+            if pv_config_entry["horizon"] != "":
+                horizon_string = f"&horizont={pv_config_entry['horizon']}"
+            url = (
+                f"{EOS_API_GET_PV_FORECAST}?lat={pv_config_entry['lat']}"
+                f"&lon={pv_config_entry['lon']}"
+                f"&azimuth={pv_config_entry['azimuth']}"
+                f"&tilt={pv_config_entry['tilt']}"
+                f"&power={pv_config_entry['power']}"
+                f"&powerInverter={pv_config_entry['powerInverter']}"
+                f"&inverterEfficiency={pv_config_entry['inverterEfficiency']}"
+                f"&timezone={self.time_zone}{horizon_string}"
+            )
+            self.forecast_request_urls[cache_key] = url
+        return url
 
     def __get_default_pv_forcast(self, pv_power):
         """
@@ -417,16 +438,26 @@ class PvInterface:
             logger.debug("[PV-IF] fetching forecast for evcc config")
             forecast = self.get_pv_forecast("evcc_config", tgt_duration)
             forecast_values = forecast
-        else:
-            for config_entry in self.config:
-                logger.debug("[PV-IF] fetching forecast for '%s'", config_entry["name"])
-                forecast = self.get_pv_forecast(config_entry, tgt_duration)
-                # print("values for " + config_entry+ " -> ")
-                # print(forecast)
-                if not forecast_values:
-                    forecast_values = forecast
-                else:
-                    forecast_values = [x + y for x, y in zip(forecast_values, forecast)]
+        elif self.config:
+            logger.debug(
+                "[PV-IF] fetching forecast for %s",
+                ", ".join(f"'{config_entry['name']}'" for config_entry in self.config),
+            )
+            # the arrays are independent requests - fetch them concurrently
+            with ThreadPoolExecutor(max_workers=len(self.config)) as executor:
+                forecasts = list(
+                    executor.map(
+                        self.get_pv_forecast,
+                        self.config,
+                        [tgt_duration] * len(self.config),
+                    )
+                )
+            # sum up all arrays in one buffer - limited to the shortest forecast
+            length = min(len(forecast) for forecast in forecasts)
+            total = np.zeros(length)
+            for forecast in forecasts:
+                total += np.asarray(forecast[:length], dtype=np.float64)
+            forecast_values = total.tolist()
         logger.debug("[PV-IF] Summarized PV forecast values: %s", forecast_values)
         return forecast_values
 
@@ -446,12 +477,34 @@ class PvInterface:
             )
 
         forecast_request_payload = self.__create_forecast_request(pv_config_entry)
+        # the forecast changes at most hourly and power and temperature share the
+        # same request - reuse the response of the current hour
+        current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        cached = self.akkudoktor_response_cache.get(forecast_request_payload)
 
         def request_func():
-            response = requests.get(forecast_request_payload, timeout=5)
+            if cached is not None and cached[0] == current_hour:
+                return cached[1]
+            response = self.session.get(forecast_request_payload, timeout=5)
             response.raise_for_status()
-            day_values = response.json()
-            return day_values["values"]
+            # keep only the fields read below - every entry carries a lot more
+            # weather values, which would otherwise stay cached for the hour
+            day_values = [
+                [
+                    {
+                        key: forecast[key]
+                        for key in AKKUDOKTOR_FORECAST_FIELDS
+                        if key in forecast
+                    }
+                    for forecast in forecast_entry
+                ]
+                for forecast_entry in json_loads_response(response)["values"]
+            ]
+            self.akkudoktor_response_cache[forecast_request_payload] = (
+                current_hour,
+                day_values,
+            )
+            return day_values
 
         def error_handler(error_type, exception):
             return self._handle_interface_error(
@@ -472,23 +525,31 @@ class PvInterface:
             )
             end_time = current_time + timedelta(hours=tgt_duration)
 
-            for forecast_entry in day_values:
-                for forecast in forecast_entry:
-                    entry_time = datetime.fromisoformat(forecast["datetime"])
-                    if entry_time.tzinfo is None:
-                        # If datetime is naive, localize it
-                        entry_time = pytz.timezone(self.time_zone).localize(entry_time)
-                    else:
-                        # Convert to configured timezone
-                        entry_time = entry_time.astimezone(
-                            pytz.timezone(self.time_zone)
-                        )
-                    if current_time <= entry_time < end_time:
-                        value = forecast.get(tgt_value, 0)
-                        # if power is negative, set it to 0 (fixing wrong values from api)
-                        if tgt_value == "power" and value < 0:
-                            value = 0
-                        forecast_values.append(value)
+            forecasts = [
+                forecast for forecast_entry in day_values for forecast in forecast_entry
+            ]
+            # parse all timestamps at once in the configured timezone
+            timestamps = [forecast["datetime"] for forecast in forecasts]
+            if timestamps and datetime.fromisoformat(timestamps[0]).tzinfo is None:
+                # naive timestamps are local times - like pytz localize() the
+                # repeated hour of a time change is taken as standard time and a
+                # skipped hour is moved one hour forward
+                entry_times = pd.to_datetime(timestamps, format="ISO8601").tz_localize(
+                    tz, ambiguous=False, nonexistent=pd.Timedelta(hours=1)
+                )
+            else:
+                entry_times = pd.to_datetime(
+                    timestamps, format="ISO8601", utc=True
+                ).tz_convert(tz)
+            in_range = (entry_times >= current_time) & (entry_times < end_time)
+
+            for forecast, is_in_range in zip(forecasts, in_range):
+                if is_in_range:
+                    value = forecast.get(tgt_value, 0)
+                    # if power is negative, set it to 0 (fixing wrong values from api)
+                    if tgt_value == "power" and value < 0:
+                        value = 0
+                    forecast_values.append(value)
 
             # workaround for wrong time points in the forecast from akkudoktor
             # remove first entry and append 0 to the end
@@ -614,7 +675,7 @@ class PvInterface:
         )
 
         def request_func():
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             return response
 
@@ -629,7 +690,7 @@ class PvInterface:
         response = self._retry_request(request_func, error_handler)
 
         def json_func():
-            return response.json()
+            return json_loads_response(response)
 
         data = self._retry_request(json_func, error_handler)
 
@@ -823,7 +884,7 @@ class PvInterface:
         logger.debug("[PV-IF] Fetching PV forecast from Forecast.Solar API: %s", url)
 
         def request_func():
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             return response
 
@@ -838,7 +899,7 @@ class PvInterface:
         response = self._retry_request(request_func, error_handler)
 
         def json_func():
-            data = response.json()
+            data = json_loads_response(response)
             watt_hours_period = data.get("result", {}).get("watt_hours_period", {})
             return watt_hours_period
 
@@ -900,7 +961,7 @@ class PvInterface:
         logger.debug("[PV-IF] Fetching PV forecast from EVCC API: %s", url)
 
         def request_func():
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             return response
 
@@ -915,7 +976,7 @@ class PvInterface:
         response = self._retry_request(request_func, error_handler)
 
         def json_func():
-            data = response.json()
+            data = json_loads_response(response)
             solar_forecast_all = data.get("forecast", {}).get("solar", {})
             solar_forecast_scale = solar_forecast_all.get("scale", "unknown")
             solar_forecast = solar_forecast_all.get("timeseries", [])
@@ -1058,7 +1119,7 @@ class PvInterface:
         )
 
         def request_func():
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            response = self.session.get(url, params=params, headers=headers, timeout=15)
             logger.debug("[PV-IF] Solcast API response status: %d", response.status_code)
             if response.status_code == 429:
                 raise requests.exceptions.RequestException("rate_limit")
@@ -1090,7 +1151,7 @@ class PvInterface:
         response = self._retry_request(request_func, error_handler)
 
         def json_func():
-            return response.json()
+            return json_loads_response(response)
 
         data = self._retry_request(json_func, error_handler)
 
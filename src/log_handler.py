@@ -1,5 +1,6 @@
 """
-Custom in-memory logging handler for thread-safe log storage and retrieval.
+Custom in-memory logging handler for thread-safe log storage and retrieval and a
+log formatter for the configured timezone.
 """
 
 import logging
@@ -295,3 +296,29 @@ class MemoryLogHandler(logging.Handler):
         """Convert log level to numeric severity for sorting/filtering"""
         levels = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
         return levels.get(level_name, 0)
+
+
+class TimezoneFormatter(logging.Formatter):
+    """
+    A custom logging formatter that formats log timestamps according to a specified timezone.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, tz=None):
+        super().__init__(fmt, datefmt)
+        self.tz = tz
+        # (second, format) -> formatted string of the last record; the time formats
+        # used here have a resolution of one second, so records within the same
+        # second can share the string
+        self._last_formatted_time = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        time_format = datefmt or self.default_time_format
+        time_key = (int(record.created), time_format)
+        last_key, last_formatted = self._last_formatted_time
+        if last_key == time_key:
+            return last_formatted
+        # Convert the record's timestamp to the configured timezone
+        record_time = datetime.fromtimestamp(record.created, self.tz)
+        formatted = record_time.strftime(time_format)
+        self._last_formatted_time = (time_key, formatted)
+        return formatted
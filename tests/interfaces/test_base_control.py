@@ -0,0 +1,46 @@
+import pytest
+from src.interfaces.base_control import check_mode_override, parse_override_duration
+
+
+@pytest.mark.parametrize(
+    "duration_string, expected",
+    [("00:30", 30), ("1:00", 60), ("12:00", 720)],
+)
+def test_parse_override_duration(duration_string, expected):
+    assert parse_override_duration(duration_string) == expected
+
+
+@pytest.mark.parametrize("duration_string", ["1", "0130", "1:5", "aa:bb", None])
+def test_parse_override_duration_rejects_invalid_format(duration_string):
+    """
+    Test that a duration without a colon or with wrong digits is rejected.
+    """
+    with pytest.raises(ValueError):
+        parse_override_duration(duration_string)
+
+
+def test_check_mode_override_accepts_valid_values():
+    assert check_mode_override(0, 60, 0.5, 5.0) is None
+    assert check_mode_override(2, 12 * 60, 5.0, 5.0) is None
+    assert check_mode_override(-2, 30, 5.0, 5.0) is None
+    assert check_mode_override(-2, 24 * 60, 0.0, 5.0) is None
+
+
+@pytest.mark.parametrize(
+    "mode, duration, grid_charge_power, error",
+    [
+        (3, 60, 1.0, "Invalid mode value"),
+        (0, 0, 1.0, "Duration must"),
+        (0, 12 * 60 + 1, 1.0, "Duration must"),
+        (0, 60, 0.25, "Grid charge power must"),
+        (2, 60, 5.1, "Grid charge power must"),
+    ],
+)
+def test_check_mode_override_rejects_invalid_values(
+    mode, duration, grid_charge_power, error
+):
+    """
+    Test that durations above 12 hours and grid charge powers outside of
+    0.5 kW and the max charge power are rejected.
+    """
+    assert check_mode_override(mode, duration, grid_charge_power, 5.0).startswith(error)
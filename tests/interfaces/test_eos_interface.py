@@ -28,9 +28,11 @@ These tests are designed to validate and document the scheduling logic of `EosIn
 ensuring robust and predictable job timing for EOS data collection processes.
 """
 
+import json
 import time
 from datetime import datetime, timedelta
 import pytest
+import pandas as pd
 from src.interfaces.eos_interface import EosInterface
 
 
@@ -265,3 +267,75 @@ def test_simulation_over_time():
         )
 
     assert True  # Always pass - this is for documentation
+
+
+def test_create_dataframe_maps_profile_values():
+    """
+    Every date gets the energy of its month, weekday and hour - dates without a
+    profile entry stay NaN.
+    """
+    ei = EosInterface("localhost", 1234, None)
+    # 2025-01-06 is a Monday
+    profile = [(1, 0, 8, 250.0), (1, 0, 9, 300.0), (12, 6, 23, 120.5)]
+    df = ei.create_dataframe(profile)
+
+    assert df.loc["2025-01-06 08:00", "Household"] == 250.0
+    assert df.loc["2025-01-13 09:00", "Household"] == 300.0
+    assert df.loc["2025-12-28 23:00", "Household"] == 120.5
+    assert df["Household"].notna().sum() == 4 + 4 + 4
+
+
+def test_create_dataframe_for_given_dates():
+    """
+    Only the given hours are created, each with the value of its profile slot.
+    """
+    ei = EosInterface("localhost", 1234, None)
+    dates = pd.date_range(start="2025-01-06 07:00", periods=3, freq="h")
+    df = ei.create_dataframe([(1, 0, 8, 250.0)], dates)
+
+    assert list(df.index) == list(dates)
+    assert df["Household"].isna().tolist() == [True, False, True]
+    assert df.loc["2025-01-06 08:00", "Household"] == 250.0
+
+
+def test_send_measurement_to_eos_puts_series_as_json_body():
+    """
+    The load series goes into the json body of the put request - hours without
+    a value are left out.
+    """
+
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def __init__(self):
+            self.calls = []
+
+        def put(self, url, **kwargs):
+            self.calls.append((url, kwargs))
+            return FakeResponse()
+
+    session = FakeSession()
+    ei = EosInterface("localhost", 1234, None, session=session)
+    dates = pd.date_range(start="2025-01-06 07:00", periods=3, freq="h", tz="UTC")
+    ei.send_measurement_to_eos(
+        pd.DataFrame({"Household": [100.0, float("nan"), 300.5]}, index=dates)
+    )
+
+    assert len(session.calls) == 1
+    url, kwargs = session.calls[0]
+    assert url == (
+        "http://localhost:1234/v1/measurement/load-mr/series/by-name?name=Household"
+    )
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    body = json.loads(kwargs["data"])
+    assert set(body) == {"data", "dtype", "tz"}
+    assert body["dtype"] == "float64"
+    assert body["tz"] == "UTC"
+    assert body["data"] == {
+        "2025-01-06T07:00:00+00:00": 100.0,
+        "2025-01-06T09:00:00+00:00": 300.5,
+    }
@@ -0,0 +1,24 @@
+import json
+import numpy as np
+import pytest
+from src.interfaces.json_utils import iter_json_object_with_list, json_dumps_compact
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4, 5, 9])
+def test_iter_json_object_with_list_matches_compact_json(count):
+    """
+    Test that the streamed object parses to the same data as the object
+    serialized at once - for empty lists and lists around the batch size.
+    """
+    items = [
+        {"message": f'entry "{index}"', "value": np.float64(index) / 4}
+        for index in range(count)
+    ]
+    fields = {"total_count": count, "timestamp": "2026-10-15T12:00:00+02:00"}
+
+    streamed = "".join(iter_json_object_with_list("logs", items, fields, batch_size=4))
+
+    assert json.loads(streamed) == json.loads(
+        json_dumps_compact({"logs": items, **fields})
+    )
+    assert list(json.loads(streamed)) == ["logs", "total_count", "timestamp"]
@@ -0,0 +1,280 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.interfaces.load_interface import LoadInterface
+
+DAY = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def make_changes(start, hours, base):
+    """
+    Creates state changes every 17 minutes - with a run of 'unavailable' states
+    across the 04:00 boundary of the first day and one state that is no number.
+    """
+    start_ts = start.timestamp()
+    unavailable_from = DAY.timestamp() + 3 * 3600 + 600
+    unavailable_to = DAY.timestamp() + 4 * 3600 + 2400
+    changes = []
+    timestamp = start_ts + 180
+    index = 0
+    while timestamp < start_ts + hours * 3600:
+        state = str(base + (index * 37) % 500)
+        if unavailable_from <= timestamp <= unavailable_to:
+            state = "unavailable"
+        if index == 45:
+            state = "unknown"
+        changes.append((timestamp, state))
+        timestamp += 17 * 60
+        index += 1
+    return changes
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+        self.content = json.dumps(data).encode()
+        self.text = ""
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeHomeAssistantSession:
+    """
+    Answers history requests like Home Assistant - the state at the start time
+    followed by the changes within the range.
+    """
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def history(self, sensor, start_ts, end_ts):
+        entries = []
+        previous = [change for change in self.changes[sensor] if change[0] <= start_ts]
+        if previous:
+            entries.append({"state": previous[-1][1], "last_changed": iso(start_ts)})
+        entries.extend(
+            {"state": state, "last_changed": iso(timestamp)}
+            for timestamp, state in self.changes[sensor]
+            if start_ts < timestamp < end_ts
+        )
+        return entries
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        sensor = params["filter_entity_id"]
+        start_ts = datetime.fromisoformat(url.rsplit("/", 1)[1]).timestamp()
+        end_ts = datetime.fromisoformat(params["end_time"]).timestamp()
+        with self.lock:
+            self.requests.append((sensor, start_ts, end_ts))
+        return FakeResponse([self.history(sensor, start_ts, end_ts)])
+
+
+class FakeOpenhabSession:
+    """
+    Answers persistence requests like OpenHAB - the samples within the range.
+    """
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.requests = []
+
+    def history(self, sensor, start_ts, end_ts):
+        return [
+            {"time": int(timestamp * 1000), "state": state}
+            for timestamp, state in self.changes[sensor]
+            if start_ts <= timestamp <= end_ts
+        ]
+
+    def get(self, url, params=None, timeout=None):
+        sensor = url.rsplit("/", 1)[1]
+        start_ts = datetime.fromisoformat(params["starttime"]).timestamp()
+        end_ts = datetime.fromisoformat(params["endtime"]).timestamp()
+        self.requests.append((sensor, start_ts, end_ts))
+        return FakeResponse({"data": self.history(sensor, start_ts, end_ts)})
+
+
+def reference_energy(entries):
+    """
+    The time weighted average of one hour as it was calculated sample by sample
+    from the history of the single hour.
+    """
+    total_energy = 0.0
+    total_duration = 0.0
+    last_state = 0.0
+    current_time = datetime.now()
+    for (state, time_string), (next_state, next_time_string) in zip(
+        entries, entries[1:]
+    ):
+        try:
+            current_state = float(state)
+            last_state = float(next_state)
+        except ValueError:
+            continue
+        current_time = datetime.fromisoformat(time_string)
+        duration = (
+            datetime.fromisoformat(next_time_string) - current_time
+        ).total_seconds()
+        total_energy += current_state * duration
+        total_duration += duration
+    if total_duration < 3600:
+        duration = (
+            (current_time + timedelta(seconds=3600)).replace(
+                minute=0, second=0, microsecond=0
+            )
+            - current_time
+        ).total_seconds()
+        total_energy += last_state * duration
+        total_duration += duration
+    if total_duration > 0:
+        return round(total_energy / total_duration, 4)
+    return 0
+
+
+def reference_profile(hour_entries, hours):
+    """
+    The load profile from one history request per sensor and hour.
+    """
+    profile = []
+    for hour in hours:
+        start_ts = hour.timestamp()
+        load = abs(reference_energy(hour_entries("load", start_ts, start_ts + 3600)))
+        car = abs(reference_energy(hour_entries("car", start_ts, start_ts + 3600)))
+        profile.append(load - car if car <= load else load)
+    return profile
+
+
+def test_homeassistant_profile_matches_hourly_requests():
+    """
+    Two adjacent days are fetched with one request per sensor - every hour,
+    including the first one of the second day and the hours with unavailable
+    states, matches the profile of one request per hour.
+    """
+    changes = {
+        "load": make_changes(DAY - timedelta(hours=1), 49, 1000),
+        "car": make_changes(DAY - timedelta(hours=1), 49, 100),
+    }
+    session = FakeHomeAssistantSession(changes)
+    load_interface = LoadInterface(
+        {
+            "source": "homeassistant",
+            "url": "http://homeassistant",
+            "access_token": "token",
+            "load_sensor": "load",
+            "car_charge_load_sensor": "car",
+        },
+        session=session,
+    )
+    days = [
+        (DAY, DAY + timedelta(days=1)),
+        (DAY + timedelta(days=1), DAY + timedelta(days=2)),
+    ]
+
+    profiles = load_interface.get_load_profiles_for_days(days)
+
+    assert sorted(session.requests) == [
+        ("car", DAY.timestamp(), (DAY + timedelta(days=2)).timestamp()),
+        ("load", DAY.timestamp(), (DAY + timedelta(days=2)).timestamp()),
+    ]
+
+    def hour_entries(sensor, start_ts, end_ts):
+        return [
+            (entry["state"], entry["last_changed"])
+            for entry in session.history(sensor, start_ts, end_ts)
+        ]
+
+    for (start_time, _), profile in zip(days, profiles):
+        hours = [start_time + timedelta(hours=hour) for hour in range(24)]
+        assert profile == pytest.approx(
+            reference_profile(hour_entries, hours), abs=1e-3
+        )
+    # the hour with unavailable states still gets the average of the valid part
+    assert profiles[0][3] > 0
+
+
+def test_openhab_profile_matches_hourly_requests():
+    changes = {
+        "load": make_changes(DAY, 24, 1000),
+        "car": make_changes(DAY, 24, 100),
+    }
+    session = FakeOpenhabSession(changes)
+    load_interface = LoadInterface(
+        {
+            "source": "openhab",
+            "url": "http://openhab",
+            "load_sensor": "load",
+            "car_charge_load_sensor": "car",
+        },
+        session=session,
+    )
+
+    profile = load_interface.get_load_profile_for_day(DAY, DAY + timedelta(days=1))
+
+    assert len(session.requests) == 2
+
+    def hour_entries(sensor, start_ts, end_ts):
+        return [
+            (entry["state"], iso(entry["time"] / 1000))
+            for entry in session.history(sensor, start_ts, end_ts)
+            if entry["time"] / 1000 < end_ts
+        ]
+
+    hours = [DAY + timedelta(hours=hour) for hour in range(24)]
+    assert profile == pytest.approx(reference_profile(hour_entries, hours), abs=1e-3)
+
+
+def test_homeassistant_history_of_past_days_is_reused():
+    """
+    Finished days are requested once and reused - today and days older than
+    the cache period are requested again.
+    """
+    midnight = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    start = midnight - timedelta(days=21)
+    changes = {
+        "load": make_changes(start, 23 * 24, 1000),
+        "car": make_changes(start, 23 * 24, 100),
+    }
+    session = FakeHomeAssistantSession(changes)
+    load_interface = LoadInterface(
+        {
+            "source": "homeassistant",
+            "url": "http://homeassistant",
+            "access_token": "token",
+            "load_sensor": "load",
+            "car_charge_load_sensor": "car",
+        },
+        session=session,
+    )
+    profile_days = [
+        (midnight - timedelta(days=days), midnight - timedelta(days=days - 1))
+        for days in (7, 14, 6, 13)
+    ]
+
+    first = load_interface.get_load_profiles_for_days(profile_days)
+    # the days before and after each other are requested together
+    assert len(session.requests) == 4
+    assert load_interface.get_load_profiles_for_days(profile_days) == first
+    assert len(session.requests) == 4
+
+    today = [(midnight, midnight + timedelta(days=1))]
+    load_interface.get_load_profiles_for_days(today)
+    load_interface.get_load_profiles_for_days(today)
+    assert len(session.requests) == 8
+
+    old_day = [(midnight - timedelta(days=20), midnight - timedelta(days=19))]
+    load_interface.get_load_profiles_for_days(old_day)
+    load_interface.get_load_profiles_for_days(old_day)
+    assert len(session.requests) == 12
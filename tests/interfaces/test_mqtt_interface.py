@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock, call
+import pytest
+import src.interfaces.mqtt_interface as mqtt_module
+from src.interfaces.mqtt_interface import MqttInterface
+
+AC_DEMAND = "control/eos_ac_charge_demand"
+DC_DEMAND = "control/eos_dc_charge_demand"
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch):
+    """
+    Replaces the monotonic clock of the mqtt interface with a settable one.
+    """
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(mqtt_module.time, "monotonic", lambda: clock["now"])
+    return clock
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch):
+    """
+    Replaces the paho client with a mock - connecting always succeeds.
+    """
+    client = MagicMock()
+    monkeypatch.setattr(mqtt_module.mqtt, "Client", lambda: client)
+    return client
+
+
+@pytest.fixture(name="mqtt_interface")
+def fixture_mqtt_interface(client, clock):
+    mqtt_interface = MqttInterface({"enabled": True, "broker": "broker"})
+    client.publish.reset_mock()
+    return mqtt_interface
+
+
+def published(client):
+    return [(args[0], args[1]) for args, _ in client.publish.call_args_list]
+
+
+def test_batch_publishes_changed_topics_once_at_exit(mqtt_interface, client):
+    """
+    Test that the topics updated within a (nested) batch are published once,
+    with their last value, when the outer batch is left.
+    """
+    with mqtt_interface.batch():
+        mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+        with mqtt_interface.batch():
+            mqtt_interface.update_publish_topics({DC_DEMAND: {"value": 200}})
+        mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 300}})
+        assert not client.publish.called
+
+    assert sorted(published(client)) == [
+        ("eos_connect/" + AC_DEMAND, 300),
+        ("eos_connect/" + DC_DEMAND, 200),
+    ]
+
+
+def test_unchanged_topic_is_not_published_again(mqtt_interface, client):
+    mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+    mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+    with mqtt_interface.batch():
+        mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+
+    assert published(client) == [("eos_connect/" + AC_DEMAND, 100)]
+
+
+def test_unchanged_topic_is_republished_after_interval(mqtt_interface, client, clock):
+    """
+    Test that an unchanged value is published again once it was not published
+    for republish_interval seconds.
+    """
+    mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+    clock["now"] += mqtt_interface.republish_interval
+    mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+    assert client.publish.call_count == 1
+
+    clock["now"] += 1
+    mqtt_interface.update_publish_topics({AC_DEMAND: {"value": 100}})
+    assert (
+        client.publish.call_args_list
+        == [call("eos_connect/" + AC_DEMAND, 100, qos=0, retain=True)] * 2
+    )
@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+import pytest
+import src.interfaces.price_interface as price_module
+from src.interfaces.price_interface import PriceInterface
+
+
+@pytest.fixture(autouse=True)
+def patch_thread(monkeypatch):
+    # no background update thread - the prices are requested by the tests
+    monkeypatch.setattr(
+        PriceInterface, "_PriceInterface__start_update_service", lambda self: None
+    )
+
+
+class FakeDatetime(datetime):
+    current = datetime(2026, 10, 15, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeTibberSession:
+    def __init__(self, tomorrow_prices):
+        self.tomorrow_prices = tomorrow_prices
+        self.requests = 0
+
+    def post(self, url, **kwargs):
+        self.requests += 1
+        price_info = {
+            "today": [{"total": 300, "energy": 200, "startsAt": ""}] * 24,
+            "tomorrow": (
+                [{"total": 400, "energy": 300, "startsAt": ""}] * 24
+                if self.tomorrow_prices
+                else []
+            ),
+        }
+        return FakeResponse(
+            {
+                "data": {
+                    "viewer": {
+                        "homes": [{"currentSubscription": {"priceInfo": price_info}}]
+                    }
+                }
+            }
+        )
+
+
+def create_tibber_interface(monkeypatch, session):
+    monkeypatch.setattr(price_module, "datetime", FakeDatetime)
+    FakeDatetime.current = datetime(2026, 10, 15, 10, 0)
+    return PriceInterface({"source": "tibber", "token": "token"}, session=session)
+
+
+def test_tibber_prices_cached_once_tomorrow_is_available(monkeypatch):
+    """
+    Test that the prices are requested again until tomorrow's prices are
+    published and then reused for the rest of the day.
+    """
+    session = FakeTibberSession(tomorrow_prices=False)
+    price_interface = create_tibber_interface(monkeypatch, session)
+    retrieve = price_interface._PriceInterface__retrieve_prices_from_tibber
+
+    assert retrieve(24) == [0.3] * 14 + [0.3] * 10
+    assert retrieve(24) == [0.3] * 24
+    assert session.requests == 2
+
+    session.tomorrow_prices = True
+    assert retrieve(24) == [0.3] * 14 + [0.4] * 10
+    FakeDatetime.current = datetime(2026, 10, 15, 23, 0)
+    assert retrieve(24) == [0.3] * 1 + [0.4] * 23
+    assert session.requests == 3
+
+
+def test_tibber_prices_requested_again_after_date_change(monkeypatch):
+    """
+    Test that cached prices are not used on the next day.
+    """
+    session = FakeTibberSession(tomorrow_prices=True)
+    price_interface = create_tibber_interface(monkeypatch, session)
+    retrieve = price_interface._PriceInterface__retrieve_prices_from_tibber
+
+    retrieve(24)
+    assert session.requests == 1
+
+    FakeDatetime.current = datetime(2026, 10, 16, 0, 0)
+    assert retrieve(24) == [0.3] * 24
+    assert session.requests == 2
@@ -1,13 +1,16 @@
+import json
+from datetime import datetime
 import pytest
+import src.interfaces.pv_interface as pv_module
 from src.interfaces.pv_interface import PvInterface
 
 
 @pytest.fixture(autouse=True)
 def patch_thread(monkeypatch):
-    class DummyThread:
-        def __init__(self, *args, **kwargs): pass
-        def start(self): pass
-    monkeypatch.setattr("threading.Thread", DummyThread)
+    # no background update thread - worker threads for the forecasts still run
+    monkeypatch.setattr(
+        PvInterface, "_PvInterface__start_update_service", lambda self: None
+    )
 
 
 def test_handle_interface_error_updates_state_and_returns_empty(monkeypatch):
@@ -264,3 +267,72 @@ def test_get_current_temp_forecast_returns_array():
     pv = PvInterface({}, [], {}, timezone="UTC")
     pv.temp_forecast_array = [15, 16, 17]
     assert pv.get_current_temp_forecast() == [15, 16, 17]
+
+
+def test_forecast_request_url_per_parameter_set():
+    """
+    Test that config entries without a name do not share a forecast request url.
+    """
+    pv = PvInterface({}, [], {}, timezone="UTC")
+    entry = {
+        "lat": 50,
+        "lon": 8,
+        "azimuth": 180,
+        "tilt": 30,
+        "power": 100,
+        "powerInverter": 100,
+        "inverterEfficiency": 1.0,
+        "horizon": "",
+    }
+    url_a = pv._PvInterface__create_forecast_request(entry)
+    url_b = pv._PvInterface__create_forecast_request(dict(entry, azimuth=90))
+    assert "azimuth=180" in url_a
+    assert "azimuth=90" in url_b
+    assert pv._PvInterface__create_forecast_request(dict(entry)) == url_a
+
+
+def test_akkudoktor_forecast_keeps_repeated_hour_of_time_change(monkeypatch):
+    """
+    Test that both naive 02:00 entries of the fall-back day are kept and the
+    surplus value is trimmed at the end of the forecast.
+    """
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 10, 25, 8, 0)
+
+    monkeypatch.setattr(pv_module, "datetime", FixedDatetime)
+    hours = ["00", "01", "02", "02"] + [f"{hour:02d}" for hour in range(3, 24)]
+    values = [
+        [
+            {"datetime": f"2026-10-25T{hour}:00:00", "power": index, "temperature": 10}
+            for index, hour in enumerate(hours)
+        ]
+    ]
+
+    class FakeResponse:
+        def __init__(self):
+            self.content = json.dumps({"values": values}).encode()
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def get(self, url, timeout=None):
+            return FakeResponse()
+
+    pv = PvInterface({}, [], {}, timezone="Europe/Berlin", session=FakeSession())
+    result = pv._PvInterface__get_pv_forecast_akkudoktor_api(
+        pv_config_entry={
+            "name": "A",
+            "lat": 50,
+            "lon": 8,
+            "azimuth": 180,
+            "tilt": 30,
+            "power": 100,
+            "powerInverter": 100,
+            "inverterEfficiency": 1.0,
+            "horizon": "",
+        }
+    )
+    assert result == list(range(1, 24)) + [0]
@@ -0,0 +1,38 @@
+import logging
+from zoneinfo import ZoneInfo
+from src.log_handler import TimezoneFormatter
+
+
+def make_record(created):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+    record.created = created
+    return record
+
+
+def test_timezone_formatter_reuses_time_within_same_second():
+    """
+    Test that records of the same second share the formatted time and the next
+    second is formatted again in the configured timezone.
+    """
+    formatter = TimezoneFormatter(tz=ZoneInfo("Europe/Berlin"))
+    # 2026-10-15 10:00:00 UTC
+    first = formatter.formatTime(make_record(1792058400.2))
+    second = formatter.formatTime(make_record(1792058400.9))
+    later = formatter.formatTime(make_record(1792058401.1))
+
+    assert first == "2026-10-15 12:00:00"
+    assert second is first
+    assert later == "2026-10-15 12:00:01"
+
+
+def test_timezone_formatter_formats_again_for_other_format():
+    """
+    Test that a different date format within the same second is not served
+    from the cached string.
+    """
+    formatter = TimezoneFormatter(tz=ZoneInfo("Europe/Berlin"))
+    record = make_record(1792058400.2)
+
+    assert formatter.formatTime(record) == "2026-10-15 12:00:00"
+    assert formatter.formatTime(record, "%H:%M") == "12:00"
+    assert formatter.formatTime(record) == "2026-10-15 12:00:00"